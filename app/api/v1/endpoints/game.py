@@ -1,53 +1,56 @@
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-import json
-from app.services.game_manager import manager, GameSession, game_sessions
+import logging
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, status
+import orjson
+from typing import Awaitable, Callable, Dict
+from app.services.game_manager import manager, GameSession, session_pool
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+async def _handle_user_dialogue(session: GameSession, data: dict):
+    dialogue_text = data.get("dialogue")
+    if dialogue_text:
+        await session.handle_user_dialogue(dialogue_text)
+
+# Client action name -> handler. One dict lookup per inbound frame.
+ACTIONS: Dict[str, Callable[[GameSession, dict], Awaitable[None]]] = {
+    "ready_for_next": lambda session, data: session.signal_ready_for_next(),
+    "start_speech": lambda session, data: session.start_user_speech(),
+    "stop_speech": lambda session, data: session.stop_user_speech(),
+    "user_dialogue": _handle_user_dialogue,
+}
+
 @router.websocket("/ws/{mission_id}")
 async def websocket_endpoint(websocket: WebSocket, mission_id: str):
-    await manager.connect(websocket, mission_id)
-    session: GameSession | None = None
+    session = session_pool.acquire(mission_id, manager)
+    if session is None:
+        logger.warning("Session limit reached. Refusing connection for mission %s.", mission_id)
+        # Accepted first: a close before the handshake reaches the client as a plain HTTP 403.
+        await websocket.accept()
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+        return
+
     try:
-        if mission_id not in game_sessions:
-            session = GameSession(mission_id, manager)
-            game_sessions[mission_id] = session
-            await session.start()
-        else:
-            session = game_sessions[mission_id]
+        await manager.connect(websocket, mission_id)
+        await session.start()
 
+        # Not iter_text(): clients also send binary audio frames, which receive_text() can't take.
         while True:
             message = await websocket.receive()
-            
-            if "text" in message:
-                data = json.loads(message["text"])
-                action = data.get("action")
-                
-                if action == "ready_for_next":
-                    print(f"Received 'ready_for_next' from client for mission {mission_id}")
-                    if session:
-                        await session.signal_ready_for_next()
-                elif action == "start_speech":
-                    print(f"Received 'start_speech' from client for mission {mission_id}")
-                    if session:
-                        await session.start_user_speech()
-                elif action == "stop_speech":
-                    print(f"Received 'stop_speech' from client for mission {mission_id}")
-                    if session:
-                        await session.stop_user_speech()
-
-                elif action == "user_dialogue":
-                    dialogue_text = data.get("dialogue")
-                    if session and dialogue_text:
-                        print(f"Received 'user_dialogue' from client for mission {mission_id}")
-                        await session.handle_user_dialogue(dialogue_text)
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+
+            text = message.get("text")
+            if text is not None:
+                data = orjson.loads(text)
+                handler = ACTIONS.get(data.get("action"))
+                if handler:
+                    await handler(session, data)
 
     except WebSocketDisconnect:
-        print(f"Client disconnected from mission {mission_id}. Cleaning up session.")
-        if mission_id in game_sessions:
-            session = game_sessions[mission_id]
-            await session.stop()
-            del game_sessions[mission_id]
-        
-        manager.disconnect(mission_id)
-        print(f"Session for mission {mission_id} closed.")
\ No newline at end of file
+        logger.info("Client disconnected from mission %s. Cleaning up session.", mission_id)
+    finally:
+        await session_pool.release(session)
+        manager.disconnect(mission_id, websocket)
+        logger.info("Session for mission %s closed.", mission_id)
\ No newline at end of file
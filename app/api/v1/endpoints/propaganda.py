@@ -1,11 +1,21 @@
 import logging
 import asyncio
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+import hashlib
+import re
+import time
+from contextlib import suppress
+from typing import Callable, Dict, List, Tuple
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query
+from fastapi.responses import ORJSONResponse
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
 from app.schemas.propaganda import (
     PropagandaMission,
+    PropagandaMissionStatus,
     PropagandaCreateRequest,
+    PropagandaGenerationResult,
+    Speaker,
 )
 from app.services import llm_service
 from app.db.mongodb_utils import get_database
@@ -13,17 +23,111 @@ from app.db import propaganda_db
 
 router = APIRouter()
 
-async def generate_and_store_unified_prompt(mission: PropagandaMission, db: AsyncIOMotorDatabase):
+LLM_CONCURRENCY = 8 # Max mission-creation LLM calls in flight, so bursts don't hit Gemini rate limits
+TOPIC_CACHE_TTL = 300.0 # Seconds a generated mission is reused for a repeated topic
+TOPIC_CACHE_MAX_SIZE = 256
+BRIEFING_CACHE_TTL = 300.0 # Seconds a briefing is reused for an identical summary and cast
+BRIEFING_CACHE_MAX_SIZE = 256
+STATUS_WAIT_MAX = 30.0 # Longest a status request may be held open waiting for Stage 2
+STATUS_DB_POLL_INTERVAL = 0.5 # Seconds between status reads while waiting on another worker's Stage 2
+STAGE2_EVENT_TTL = 600.0 # Seconds before an unfinished Stage 2 event is dropped, e.g. its task never ran
+
+_llm_semaphore = asyncio.Semaphore(LLM_CONCURRENCY)
+_topic_cache: Dict[str, Tuple[float, PropagandaGenerationResult]] = {}
+_briefing_cache: Dict[bytes, Tuple[float, str]] = {}
+# Set when a mission's Stage 2 task finishes (either way), waking long-polling status requests.
+# Per process: a request landing on a worker that didn't create the mission has no event here
+# and polls the database instead. Values are (created_at, event), oldest first.
+_stage2_finished: Dict[UUID, Tuple[float, asyncio.Event]] = {}
+_NON_WORD = re.compile(r"[\W_]+")
+
+def _track_stage2(mission_id: UUID) -> asyncio.Event:
     """
-    Background task (Stage 2): Generate the unified dialogue prompt and update the mission.
+    Registers the event a mission's Stage 2 task sets when it finishes. Entries older than
+    STAGE2_EVENT_TTL are dropped (and set) first, so a task that never ran doesn't leak one.
+    """
+    now = time.monotonic()
+    while _stage2_finished:
+        oldest_id = next(iter(_stage2_finished))
+        created_at, event = _stage2_finished[oldest_id]
+        if now - created_at < STAGE2_EVENT_TTL:
+            break
+        del _stage2_finished[oldest_id]
+        event.set()
+    finished = asyncio.Event()
+    _stage2_finished[mission_id] = (now, finished)
+    return finished
+
+def _topic_cache_key(topic: str | None) -> str | None:
+    """
+    Normalizes a topic so trivially different spellings ("The Digital Credit System!" vs
+    "the digital  credit system") share a cache entry. Returns None for topics that mustn't be cached.
+    """
+    words = _NON_WORD.sub(" ", (topic or "").casefold()).split()
+    if words and words[0] == "the":
+        words = words[1:]
+    key = " ".join(words)
+    return key if key and key != "any" else None
+
+async def _run_llm(func, /, **kwargs):
+    """Awaits an async LLM call, capped at LLM_CONCURRENCY concurrent calls."""
+    async with _llm_semaphore:
+        return await func(**kwargs)
+
+async def _generate_initial_propaganda(
+    topic: str | None,
+    on_cast: Callable[[str, List[Speaker]], None] | None = None,
+) -> PropagandaGenerationResult:
+    """
+    Stage 1 generation with a short-lived cache for repeated explicit topics.
+    'any' is never cached, since every such mission should invent a fresh topic.
+    `on_cast` is only called on a cache miss, while the result is still streaming.
+    """
+    key = _topic_cache_key(topic)
+    if key:
+        cached = _topic_cache.get(key)
+        if cached and time.monotonic() - cached[0] < TOPIC_CACHE_TTL:
+            return cached[1].model_copy(deep=True)
+
+    result = await _run_llm(llm_service.generate_initial_propaganda, topic=topic, on_cast=on_cast)
+
+    if key:
+        if len(_topic_cache) >= TOPIC_CACHE_MAX_SIZE:
+            _topic_cache.pop(next(iter(_topic_cache)))
+        _topic_cache[key] = (time.monotonic(), result)
+    return result
+
+def _briefing_cache_key(summary: str, speakers: List[Speaker]) -> bytes:
+    digest = hashlib.blake2b(summary.encode(), digest_size=16)
+    for speaker in speakers:
+        digest.update(speaker.model_dump_json().encode())
+    return digest.digest()
+
+async def _generate_unified_dialogue_prompt(summary: str, speakers: List[Speaker]) -> str:
+    """
+    Stage 2 generation with a short-lived cache keyed on the exact summary and cast. It hits
+    whenever Stage 1 came from the topic cache, so a repeated topic skips both LLM calls.
+    """
+    key = _briefing_cache_key(summary, speakers)
+    cached = _briefing_cache.get(key)
+    if cached and time.monotonic() - cached[0] < BRIEFING_CACHE_TTL:
+        return cached[1]
+
+    briefing = await _run_llm(llm_service.generate_unified_dialogue_prompt, summary=summary, speakers=speakers)
+
+    if len(_briefing_cache) >= BRIEFING_CACHE_MAX_SIZE:
+        _briefing_cache.pop(next(iter(_briefing_cache)))
+    _briefing_cache[key] = (time.monotonic(), briefing)
+    return briefing
+
+async def generate_and_store_unified_prompt(mission: PropagandaMission, db: AsyncIOMotorDatabase, prompt_task: asyncio.Task[str], finished: asyncio.Event):
+    """
+    Background task (Stage 2): Wait for the unified dialogue prompt and update the mission.
+    The LLM call itself is already running; create_mission starts it as soon as Stage 1 is done.
     """
     try:
-        # Generate the dynamic part of the prompt
-        dynamic_prompt = await asyncio.to_thread(
-            llm_service.generate_unified_dialogue_prompt,
-            mission_data=mission.generation_result,
-            topic=mission.topic
-        )
+        # The dynamic part of the prompt
+        dynamic_prompt = await prompt_task
 
         # Prepare data for update
         update_data = {
@@ -32,17 +136,20 @@ async def generate_and_store_unified_prompt(mission: PropagandaMission, db: Asyn
         }
 
         # Update the mission in the database
-        await propaganda_db.update_propaganda_mission(str(mission.id), update_data, db)
+        await propaganda_db.update_propaganda_mission(mission.id, update_data, db)
 
     except llm_service.LLMServiceError as e:
         logging.error(f"Stage 2 failed for mission {mission.id} due to LLMServiceError: {e}", exc_info=True)
-        await propaganda_db.update_propaganda_mission(str(mission.id), {"status": "stage2_failed"}, db)
+        await propaganda_db.update_propaganda_mission(mission.id, {"status": "stage2_failed"}, db)
     except Exception as e:
         logging.error(f"Stage 2 failed for mission {mission.id} due to unexpected error: {e}", exc_info=True)
-        await propaganda_db.update_propaganda_mission(str(mission.id), {"status": "stage2_failed"}, db)
+        await propaganda_db.update_propaganda_mission(mission.id, {"status": "stage2_failed"}, db)
+    finally:
+        _stage2_finished.pop(mission.id, None)
+        finished.set()
 
 
-@router.post("/create_mission", response_model=PropagandaMission, status_code=201)
+@router.post("/create_mission", response_model=PropagandaMission, status_code=201, response_class=ORJSONResponse)
 async def create_mission(
     request: PropagandaCreateRequest,
     background_tasks: BackgroundTasks,
@@ -55,11 +162,21 @@ async def create_mission(
     returns them, and then starts a background task to generate the unified
     dialogue prompt for all speakers (Stage 2).
     """
+    prompt_task: asyncio.Task[str] | None = None
+
+    def start_stage2(summary: str, speakers: List[Speaker]):
+        nonlocal prompt_task
+        prompt_task = asyncio.create_task(_generate_unified_dialogue_prompt(summary, speakers))
+
     try:
-        # 1. Generate initial propaganda content (synchronous)
-        generation_result = await asyncio.to_thread(
-            llm_service.generate_initial_propaganda, topic=request.topic
-        )
+        # 1. Generate initial propaganda content. Stage 2 starts as soon as the
+        #    summary and speakers have streamed in, while the rest is still generating.
+        try:
+            generation_result = await _generate_initial_propaganda(request.topic, on_cast=start_stage2)
+        except BaseException:
+            if prompt_task:
+                prompt_task.cancel()
+            raise
 
         # 2. Create the full mission object
         mission = PropagandaMission(
@@ -69,14 +186,23 @@ async def create_mission(
             status="stage1" # Initial status
         )
 
-        # 3. Save the mission to the database
-        await propaganda_db.create_propaganda_mission(mission, db)
+        # 3. Cached Stage 1 results never stream; start Stage 2 now, so it overlaps the insert and the response
+        if prompt_task is None:
+            start_stage2(generation_result.summary, generation_result.speakers)
 
-        # 4. Start background task for Stage 2
-        background_tasks.add_task(generate_and_store_unified_prompt, mission, db)
+        # 4. Save the mission to the database
+        try:
+            mission_dict = await propaganda_db.create_propaganda_mission(mission, db)
+        except BaseException:
+            prompt_task.cancel()
+            raise
 
-        # 5. Return the created mission object
-        return mission
+        # 5. Background task stores the Stage 2 result once it arrives
+        finished = _track_stage2(mission.id)
+        background_tasks.add_task(generate_and_store_unified_prompt, mission, db, prompt_task, finished)
+
+        # 6. Return the stored document directly, without serializing the model again
+        return ORJSONResponse(mission_dict, status_code=201)
 
     except llm_service.LLMServiceError as e:
         logging.exception(f"LLM service error during mission creation: {e}")
@@ -86,15 +212,44 @@ async def create_mission(
         raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {e}")
 
 
-@router.get("/mission_status/{mission_id}", response_model=PropagandaMission)
+@router.get("/mission_status/{mission_id}", response_model=PropagandaMission, response_class=ORJSONResponse)
 async def get_mission_status(
-    mission_id: str,
+    mission_id: UUID,
     db: AsyncIOMotorDatabase = Depends(get_database)
 ):
     """
     Retrieves the current status and details of a propaganda mission.
     """
-    mission = await propaganda_db.get_propaganda_mission_by_id(mission_id, db)
-    if not mission:
+    document = await propaganda_db.get_propaganda_mission_document(mission_id, db)
+    if not document:
+        raise HTTPException(status_code=404, detail="Mission not found")
+    # Stored documents were validated on insert; returning a response skips response_model re-validation.
+    return ORJSONResponse(document)
+
+
+@router.get("/mission_status_light/{mission_id}", response_model=PropagandaMissionStatus, response_class=ORJSONResponse)
+async def get_mission_status_light(
+    mission_id: UUID,
+    wait: float = Query(0.0, ge=0.0, le=STATUS_WAIT_MAX),
+    db: AsyncIOMotorDatabase = Depends(get_database)
+):
+    """
+    Retrieves only the status of a propaganda mission. Cheaper to poll than `mission_status`.
+    With `wait`, a request for a mission still in Stage 1 is held open for up to that many
+    seconds and answers as soon as Stage 2 finishes (long polling).
+    """
+    status = await propaganda_db.get_propaganda_mission_status(mission_id, db)
+    if status is None:
         raise HTTPException(status_code=404, detail="Mission not found")
-    return mission
\ No newline at end of file
+    if status == "stage1" and wait:
+        if tracked := _stage2_finished.get(mission_id):
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(tracked[1].wait(), timeout=wait)
+            status = await propaganda_db.get_propaganda_mission_status(mission_id, db)
+        else:
+            # Stage 2 runs in another worker (or already finished here): watch the database instead.
+            deadline = time.monotonic() + wait
+            while status == "stage1" and (remaining := deadline - time.monotonic()) > 0:
+                await asyncio.sleep(min(STATUS_DB_POLL_INTERVAL, remaining))
+                status = await propaganda_db.get_propaganda_mission_status(mission_id, db)
+    return {"_id": mission_id, "status": status}
\ No newline at end of file
@@ -1,41 +1,49 @@
 import os
+from dataclasses import dataclass, field
 from dotenv import load_dotenv
 
-load_dotenv()
+# Deployments that already provide the environment (e.g. containers) can skip the .env lookup.
+if not os.getenv("RADIO_MIRCHI_NO_DOTENV"):
+    load_dotenv()
 
+def _env(name: str, default: str | None = None, secret: bool = False):
+    # Secrets are left out of the repr so they don't end up in logs.
+    return field(default_factory=lambda: os.getenv(name, default), repr=not secret)
+
+@dataclass(frozen=True, slots=True)
 class Settings:
-    MONGODB_URI: str
-    MONGODB_DB: str
-    DEEPGRAM_API_KEY: str
-    GOOGLE_API_KEY: str
-    SECRET_KEY: str
-    API_SECRET: str
-    HOST: str
-    PORT: int
-
-    def __init__(self):
-        # MongoDB Configuration
-        self.MONGODB_URI = os.getenv("MONGODB_URI", "mongodb://localhost:27017")
-        self.MONGODB_DB = os.getenv("MONGODB_DB", "radio_mirchi")
-
-        # Deepgram Configuration
-        deepgram_api_key = os.getenv("DEEPGRAM_API_KEY")
-        if deepgram_api_key is None:
+    # MongoDB Configuration
+    MONGODB_URI: str = _env("MONGODB_URI", "mongodb://localhost:27017")
+    MONGODB_DB: str = _env("MONGODB_DB", "radio_mirchi")
+
+    # Deepgram Configuration
+    DEEPGRAM_API_KEY: str = _env("DEEPGRAM_API_KEY", secret=True)
+
+    # Google Gemini Configuration
+    GOOGLE_API_KEY: str = _env("GOOGLE_API_KEY", secret=True)
+    # Model per call site. Everything runs on the fast tier: a short briefing doesn't need a larger model.
+    GEMINI_SETUP_MODEL: str = _env("GEMINI_SETUP_MODEL", "gemini-2.5-flash-lite")
+    GEMINI_BRIEFING_MODEL: str = _env("GEMINI_BRIEFING_MODEL", "gemini-2.5-flash-lite")
+    GEMINI_DIALOGUE_MODEL: str = _env("GEMINI_DIALOGUE_MODEL", "gemini-2.5-flash-lite-preview-06-17")
+    GEMINI_SUMMARY_MODEL: str = _env("GEMINI_SUMMARY_MODEL", "gemini-2.5-flash-lite")
+    # Sampling temperature for dialogue. 0 makes a batch reproducible for the same prompt.
+    GEMINI_DIALOGUE_TEMPERATURE: float = field(default_factory=lambda: float(os.getenv("GEMINI_DIALOGUE_TEMPERATURE", 0.9)))
+    # Replay dialogue batches for identical prompt inputs. Only takes effect with
+    # GEMINI_DIALOGUE_TEMPERATURE=0; otherwise a replay would repeat one random draw.
+    DIALOGUE_CACHE_ENABLED: bool = field(default_factory=lambda: os.getenv("DIALOGUE_CACHE_ENABLED", "").lower() in ("1", "true", "yes"))
+
+    # Application Configuration
+    SECRET_KEY: str = _env("SECRET_KEY", "your_secret_key_here", secret=True)
+    API_SECRET: str = _env("API_SECRET", "your_api_secret_here", secret=True)
+
+    # Server Configuration
+    HOST: str = _env("HOST", "0.0.0.0")
+    PORT: int = field(default_factory=lambda: int(os.getenv("PORT", 8000)))
+
+    def __post_init__(self):
+        if self.DEEPGRAM_API_KEY is None:
             raise ValueError("DEEPGRAM_API_KEY environment variable not set.")
-        self.DEEPGRAM_API_KEY = deepgram_api_key
-
-        # Google Gemini Configuration
-        google_api_key = os.getenv("GOOGLE_API_KEY")
-        if google_api_key is None:
+        if self.GOOGLE_API_KEY is None:
             raise ValueError("GOOGLE_API_KEY environment variable not set.")
-        self.GOOGLE_API_KEY = google_api_key
-
-        # Application Configuration
-        self.SECRET_KEY = os.getenv("SECRET_KEY", "your_secret_key_here")
-        self.API_SECRET = os.getenv("API_SECRET", "your_api_secret_here")
-
-        # Server Configuration
-        self.HOST = os.getenv("HOST", "0.0.0.0")
-        self.PORT = int(os.getenv("PORT", 8000))
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
@@ -3,6 +3,7 @@ from app.core.config import settings
 
 class DataBase:
     client: AsyncIOMotorClient | None = None
+    database: AsyncIOMotorDatabase | None = None
 
 db = DataBase()
 
@@ -11,18 +12,30 @@ async def get_database() -> AsyncIOMotorDatabase:
     Returns the application's database instance.
     Raises an exception if the client is not initialized.
     """
-    if db.client is None:
+    if db.database is None:
         raise Exception("Database client not initialized. Ensure `connect_to_mongo` is called on application startup.")
-    return db.client[settings.MONGODB_DB]
+    return db.database
 
 async def connect_to_mongo():
     """Connects to the MongoDB database."""
     db.client = AsyncIOMotorClient(
         settings.MONGODB_URI,
-        uuidRepresentation='standard'
+        uuidRepresentation='standard',
+        # Keep a few warm connections and fail fast instead of hanging when the pool is exhausted.
+        maxPoolSize=50,
+        minPoolSize=5,
+        maxIdleTimeMS=60_000,
+        serverSelectionTimeoutMS=3_000,
+        waitQueueTimeoutMS=2_000,
+        retryWrites=True,
+        # Mission documents carry long LLM prompts; compress them on the wire.
+        compressors='zstd,zlib'
     )
+    db.database = db.client[settings.MONGODB_DB]
 
 async def close_mongo_connection():
     """Closes the MongoDB database connection."""
     if db.client:
-        db.client.close()
\ No newline at end of file
+        db.client.close()
+        db.client = None
+        db.database = None
\ No newline at end of file
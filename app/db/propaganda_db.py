@@ -1,43 +1,66 @@
-from motor.motor_asyncio import AsyncIOMotorDatabase
-from app.schemas.propaganda import PropagandaMission
-from bson import ObjectId
-from bson.errors import InvalidId
+from motor.motor_asyncio import AsyncIOMotorCollection, AsyncIOMotorDatabase
+from app.schemas.propaganda import PropagandaMission, PropagandaGenerationResult, Speaker
+from uuid import UUID
 
-async def get_propaganda_collection(db: AsyncIOMotorDatabase):
-    return db.missions
+# (database, collection) pair, resolved once per database handle.
+_missions_collection: tuple[AsyncIOMotorDatabase, AsyncIOMotorCollection] | None = None
 
-async def create_propaganda_mission(mission: PropagandaMission, db: AsyncIOMotorDatabase) -> PropagandaMission:
+def get_propaganda_collection(db: AsyncIOMotorDatabase) -> AsyncIOMotorCollection:
+    global _missions_collection
+    if _missions_collection is None or _missions_collection[0] is not db:
+        _missions_collection = (db, db.missions)
+    return _missions_collection[1]
+
+def _mission_from_document(document: dict) -> PropagandaMission:
+    """
+    Builds a PropagandaMission from a stored document without re-running validation.
+    Documents are validated before insert, so the database is trusted here.
+    """
+    result = document["generation_result"]
+    generation_result = PropagandaGenerationResult.model_construct(
+        **{**result, "speakers": [Speaker.model_construct(**speaker) for speaker in result["speakers"]]}
+    )
+    return PropagandaMission.model_construct(**{**document, "generation_result": generation_result})
+
+async def create_propaganda_mission(mission: PropagandaMission, db: AsyncIOMotorDatabase) -> dict:
     """
     Inserts a new propaganda mission document into the database.
+    Returns the inserted document so callers can reuse it instead of dumping the model again.
     """
-    collection = await get_propaganda_collection(db)
+    collection = get_propaganda_collection(db)
     mission_dict = mission.model_dump(by_alias=True)
     await collection.insert_one(mission_dict)
-    return mission
+    return mission_dict
+
+async def get_propaganda_mission_document(mission_id: UUID, db: AsyncIOMotorDatabase) -> dict | None:
+    """
+    Retrieves a propaganda mission's raw document, for callers that only pass it on, e.g. as JSON.
+    """
+    collection = get_propaganda_collection(db)
+    return await collection.find_one({"_id": mission_id})
 
-async def get_propaganda_mission_by_id(mission_id: str, db: AsyncIOMotorDatabase) -> PropagandaMission | None:
+async def get_propaganda_mission_by_id(mission_id: UUID, db: AsyncIOMotorDatabase) -> PropagandaMission | None:
     """
     Retrieves a propaganda mission by its ID.
     """
-    collection = await get_propaganda_collection(db)
-    try:
-        mission_data = await collection.find_one({"_id": ObjectId(mission_id)})
-    except InvalidId:
-        return None
+    mission_data = await get_propaganda_mission_document(mission_id, db)
+    if mission_data:
+        return _mission_from_document(mission_data)
+    return None
+
+async def get_propaganda_mission_status(mission_id: UUID, db: AsyncIOMotorDatabase) -> str | None:
+    """
+    Retrieves only the status of a propaganda mission, projecting away the rest of the document.
+    """
+    collection = get_propaganda_collection(db)
+    mission_data = await collection.find_one({"_id": mission_id}, projection={"status": 1})
     if mission_data:
-        return PropagandaMission(**mission_data)
+        return mission_data.get("status")
     return None
 
-async def update_propaganda_mission(mission_id: str, data: dict, db: AsyncIOMotorDatabase) -> None:
+async def update_propaganda_mission(mission_id: UUID, data: dict, db: AsyncIOMotorDatabase) -> None:
     """
     Updates a propaganda mission in the database.
     """
-    collection = await get_propaganda_collection(db)
-    try:
-        await collection.update_one({"_id": ObjectId(mission_id)}, {"$set": data})
-    except InvalidId:
-        # If the mission_id is not a valid ObjectId, the update cannot proceed.
-        # This might indicate an attempt to update a non-existent or malformed ID.
-        # Depending on desired behavior, you might log this or raise an HTTPException.
-        # For now, we'll just let it pass silently as no update will occur.
-        pass
\ No newline at end of file
+    collection = get_propaganda_collection(db)
+    await collection.update_one({"_id": mission_id}, {"$set": data})
\ No newline at end of file
@@ -1,16 +1,28 @@
+import asyncio
 import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware # Added import
+from fastapi.responses import ORJSONResponse
 from app.api.v1.endpoints import propaganda, game
 from app.db.mongodb_utils import connect_to_mongo, close_mongo_connection
+from app.services.deepgram_service import deepgram_service
+from app.services.llm_service import warm_up_genai_client
 
-# Configure logging
+# Configure logging. Records are handed to a background thread for formatting and writing,
+# so logging from the event loop never blocks on stderr.
 logging.basicConfig(level=logging.INFO)
+_root_logger = logging.getLogger()
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+log_listener = QueueListener(_log_queue, *_root_logger.handlers, respect_handler_level=True)
+_root_logger.handlers = [QueueHandler(_log_queue)]
 
 app = FastAPI(
     title="Radio Mirchi Backend",
     description="Backend for the Radio Mirchi hackathon project.",
-    version="0.1.0"
+    version="0.1.0",
+    default_response_class=ORJSONResponse
 )
 
 # CORS Middleware Configuration
@@ -30,15 +42,31 @@ app.add_middleware(
 
 @app.on_event("startup")
 async def startup_event():
+    log_listener.start()
+    # In the background: startup shouldn't wait on, or fail because of, Gemini.
+    app.state.genai_warm_up = asyncio.create_task(warm_up_genai_client())
     await connect_to_mongo()
 
 @app.on_event("shutdown")
 async def shutdown_event():
+    await deepgram_service.close()
     await close_mongo_connection()
+    log_listener.stop() # Flushes anything still queued
 
 app.include_router(propaganda.router, prefix="/api/v1", tags=["propaganda"])
 app.include_router(game.router, prefix="/api/v1", tags=["game"])
 
 @app.get("/")
 def read_root():
-    return {"message": "Welcome to the Radio Mirchi API"}
\ No newline at end of file
+    return {"message": "Welcome to the Radio Mirchi API"}
+
+if __name__ == "__main__":
+    import uvicorn
+    from app.core.config import settings
+
+    # `python -m app.main`: same event loop and protocol stack as the Docker image.
+    # No permessage-deflate: the frames are PCM audio, which barely compresses.
+    uvicorn.run(
+        app, host=settings.HOST, port=settings.PORT,
+        loop="uvloop", http="httptools", ws="websockets", ws_per_message_deflate=False,
+    )
@@ -1,7 +1,6 @@
 from pydantic import BaseModel, Field
 from typing import List, Optional
-from pydantic_mongo import PydanticObjectId
-from bson import ObjectId
+from uuid import UUID, uuid4
 
 class Speaker(BaseModel):
     """Defines a speaker in the radio show."""
@@ -14,8 +13,9 @@ class PropagandaGenerationResult(BaseModel):
     """Schema for the data directly generated by the LLM in Stage 1."""
     topic: str = Field(..., description="The topic of the propaganda. Can be user-defined or generated by the LLM.")
     summary: str
-    proof_sentences: List[str] = Field(..., description="A few sentences that serve as 'proof' or talking points.")
+    # Speakers come before the proofs, so they finish streaming first and the briefing can start early.
     speakers: List[Speaker] = Field(..., min_length=1, max_length=4)
+    proof_sentences: List[str] = Field(..., description="A few sentences that serve as 'proof' or talking points.")
     initial_listeners: int
 
 class DialogueLine(BaseModel):
@@ -37,13 +37,18 @@ class UserDialogue(BaseModel):
 
 class PropagandaMission(BaseModel):
     """Schema for the full mission object stored in MongoDB."""
-    id: PydanticObjectId = Field(default_factory=ObjectId, alias="_id")
+    id: UUID = Field(default_factory=uuid4, alias="_id")
     user_id: str
     topic: str
     status: str = "stage1"
     generation_result: PropagandaGenerationResult
     dialogue_generator_prompt: Optional[str] = None # The dynamic part of the prompt, generated in Stage 2.
 
+class PropagandaMissionStatus(BaseModel):
+    """Lightweight status-only view of a mission, for clients polling for readiness."""
+    id: UUID = Field(..., alias="_id")
+    status: str
+
 class PropagandaCreateRequest(BaseModel):
     """Request model for creating a new propaganda mission."""
     topic: Optional[str] = "any"
@@ -1,20 +1,24 @@
 import asyncio
-import json
+import logging
 import random
+import orjson
 import httpx
-from typing import Callable, Awaitable
-from deepgram import DeepgramClient, LiveOptions, LiveTranscriptionEvents
+from collections import deque
+from typing import AsyncIterator, Callable, Awaitable, Deque, List, Optional
+from deepgram import DeepgramClient, LiveOptions, LiveTranscriptionEvents, SpeakWSOptions, SpeakWebSocketEvents
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
 # --- Voice Models ---
-MALE_VOICES = [
+MALE_VOICES = (
     "aura-2-odysseus-en", "aura-2-apollo-en", "aura-2-arcas-en", "aura-2-aries-en",
     "aura-2-atlas-en", "aura-2-draco-en", "aura-2-hermes-en", "aura-2-hyperion-en",
     "aura-2-jupiter-en", "aura-2-mars-en", "aura-2-neptune-en", "aura-2-orion-en",
     "aura-2-orpheus-en", "aura-2-pluto-en", "aura-2-saturn-en", "aura-2-zeus-en"
-]
+)
 
-FEMALE_VOICES = [
+FEMALE_VOICES = (
     "aura-2-thalia-en", "aura-2-amalthea-en", "aura-2-andromeda-en", "aura-2-asteria-en",
     "aura-2-athena-en", "aura-2-aurora-en", "aura-2-callista-en", "aura-2-cora-en",
     "aura-2-cordelia-en", "aura-2-delia-en", "aura-2-electra-en", "aura-2-harmonia-en",
@@ -22,7 +26,14 @@ FEMALE_VOICES = [
     "aura-2-juno-en", "aura-2-luna-en", "aura-2-minerva-en", "aura-2-ophelia-en",
     "aura-2-pandora-en", "aura-2-phoebe-en", "aura-2-selene-en", "aura-2-theia-en",
     "aura-2-vesta-en"
-]
+)
+
+_VOICES_BY_GENDER = {"male": MALE_VOICES, "female": FEMALE_VOICES}
+_voice_rng = random.Random() # Private RNG, so voice picks don't touch the shared global one
+
+def pick_voice(gender: str) -> str:
+    """Picks a TTS voice model for a speaker of the given gender. Unknown genders get a female voice."""
+    return _voice_rng.choice(_VOICES_BY_GENDER.get(gender.lower(), FEMALE_VOICES))
 
 class LiveTranscription:
     """
@@ -31,9 +42,18 @@ class LiveTranscription:
     """
     def __init__(self, deepgram_client: DeepgramClient):
         self.client = deepgram_client
-        self.dg_connection = self.client.listen.live.v("1")
+        # Async client: SDK callbacks run on the event loop, not on a separate SDK thread.
+        self.dg_connection = self.client.listen.asyncwebsocket.v("1")
+        # Registered once: the connection object is restarted for every utterance, and
+        # registering in start() would stack a duplicate handler on each restart.
+        self.dg_connection.on(LiveTranscriptionEvents.Transcript, self._on_transcript) # type: ignore
+        self.dg_connection.on(LiveTranscriptionEvents.Error, self._on_error) # type: ignore
         self._is_active = False
-        self.full_transcript = ""
+        self._transcript_parts: List[str] = []
+
+    @property
+    def full_transcript(self) -> str:
+        return " ".join(self._transcript_parts)
 
     async def start(self):
         options = LiveOptions(
@@ -43,97 +63,205 @@ class LiveTranscription:
             encoding="linear16",
             sample_rate=16000,
         )
-        self.dg_connection.on(LiveTranscriptionEvents.Transcript, self._on_transcript) # type: ignore
-        self.dg_connection.on(LiveTranscriptionEvents.Error, self._on_error) # type: ignore
-        
         try:
-            if not self.dg_connection.start(options): # type: ignore
-                print("[LiveTranscription] Failed to start connection.")
+            if not await self.dg_connection.start(options): # type: ignore
+                logger.error("[LiveTranscription] Failed to start connection.")
                 return
 
             self._is_active = True
-            self.full_transcript = "" # Reset transcript on start
-            print("[LiveTranscription] Connected to Deepgram via SDK.")
+            self._transcript_parts.clear() # Reset transcript on start
+            logger.debug("[LiveTranscription] Connected to Deepgram via SDK.")
         except Exception as e:
-            print(f"[LiveTranscription] Failed to connect to Deepgram: {e}")
+            logger.error("[LiveTranscription] Failed to connect to Deepgram: %s", e)
 
     async def send(self, audio_chunk: bytes):
         if self._is_active:
             await self.dg_connection.send(audio_chunk) # type: ignore
 
-    def _on_transcript(self, *args, **kwargs):
+    async def _on_transcript(self, *args, **kwargs):
         result = kwargs.get("result")
         if result and result.channel and result.channel.alternatives:
             transcript = result.channel.alternatives[0].transcript
             if transcript:
-                self.full_transcript += transcript + " "
+                self._transcript_parts.append(transcript)
 
-    def _on_error(self, *args, **kwargs):
+    async def _on_error(self, *args, **kwargs):
         error = kwargs.get("error")
-        print(f"[LiveTranscription] Deepgram Error: {error}")
+        logger.error("[LiveTranscription] Deepgram Error: %s", error)
 
     async def stop(self) -> str:
         """Stops the connection and returns the final accumulated transcript."""
         if self._is_active:
             self._is_active = False
             await self.dg_connection.finish() # type: ignore
-            print("[LiveTranscription] Connection closed.")
+            logger.debug("[LiveTranscription] Connection closed.")
         return self.full_transcript.strip()
 
+    async def recycle(self):
+        """Stops any open connection and clears state so the instance can be reused."""
+        await self.stop()
+        self._transcript_parts.clear()
+
+SPEAK_CHUNK_TIMEOUT = 10.0 # Seconds to wait for the next audio frame before giving up on a line
+TTS_HTTP_CHUNK_BYTES = 16384 # Matches the game's websocket audio frame size
+
+class SpeakStream:
+    """
+    A persistent Deepgram TTS websocket for one voice. Successive lines are sent over
+    the same connection, avoiding a new HTTP request per line. If the socket can't be
+    opened, or a line is interrupted, the connection is rebuilt on the next line, and
+    the HTTP endpoint is used as a fallback.
+    """
+    def __init__(self, service: "DeepgramService", model: str):
+        self.service = service
+        self.model = model
+        self._connection = None
+        self._audio: asyncio.Queue[Optional[bytes]] = asyncio.Queue()
+        self._lock = asyncio.Lock() # One line at a time per connection
+
+    async def _connect(self) -> bool:
+        connection = self.service.client.speak.asyncwebsocket.v("1")
+        connection.on(SpeakWebSocketEvents.AudioData, self._on_audio) # type: ignore
+        connection.on(SpeakWebSocketEvents.Flushed, self._on_flushed) # type: ignore
+        connection.on(SpeakWebSocketEvents.Error, self._on_error) # type: ignore
+        connection.on(SpeakWebSocketEvents.Close, self._on_close) # type: ignore
+        options = SpeakWSOptions(model=self.model, encoding="linear16", sample_rate=24000)
+        try:
+            if not await connection.start(options): # type: ignore
+                logger.error("[SpeakStream] Failed to start TTS websocket (model: %s).", self.model)
+                return False
+        except Exception as e:
+            logger.error("[SpeakStream] Failed to connect TTS websocket: %s", e)
+            return False
+        self._audio = asyncio.Queue()
+        self._connection = connection
+        return True
+
+    # Events from a connection we've already replaced are ignored.
+    async def _on_audio(self, client, data, **kwargs):
+        if client is self._connection:
+            self._audio.put_nowait(data)
+
+    async def _on_flushed(self, client, *args, **kwargs):
+        if client is self._connection:
+            self._audio.put_nowait(None)
+
+    async def _on_error(self, client, error=None, **kwargs):
+        logger.error("[SpeakStream] Deepgram Error: %s", error)
+        await self._on_close(client)
+
+    async def _on_close(self, client, *args, **kwargs):
+        if client is self._connection:
+            self._connection = None
+            self._audio.put_nowait(None)
+
+    async def speak(self, text: str) -> AsyncIterator[bytes]:
+        """
+        Synthesizes one line, yielding audio until Deepgram reports the line flushed.
+        Concurrent callers are served one after another.
+        """
+        async with self._lock:
+            if self._connection is None and not await self._connect():
+                async for chunk in self.service.text_to_speech_stream(text, self.model):
+                    yield chunk
+                return
+
+            completed = False
+            try:
+                await self._connection.send_text(text) # type: ignore
+                await self._connection.flush() # type: ignore
+                while True:
+                    chunk = await asyncio.wait_for(self._audio.get(), timeout=SPEAK_CHUNK_TIMEOUT)
+                    if chunk is None:
+                        break
+                    yield chunk
+                completed = True
+            except asyncio.TimeoutError:
+                logger.error("[SpeakStream] Timed out waiting for TTS audio (model: %s).", self.model)
+            finally:
+                if not completed:
+                    # Audio for the abandoned line may still arrive; start clean on the next one.
+                    await self.close()
+
+    async def close(self):
+        connection, self._connection = self._connection, None
+        if connection is not None:
+            try:
+                await connection.finish() # type: ignore
+            except Exception as e:
+                logger.debug("[SpeakStream] Error closing TTS websocket: %s", e)
+
+# One pooled client shared by every game session, so TTS requests reuse warm TLS connections.
+tts_http_client = httpx.AsyncClient(
+    http2=True,
+    headers={"Authorization": f"Token {settings.DEEPGRAM_API_KEY}", "Content-Type": "application/json"},
+    limits=httpx.Limits(max_keepalive_connections=32, max_connections=128, keepalive_expiry=60.0),
+    timeout=httpx.Timeout(60.0, connect=5.0),
+)
+
 class DeepgramService:
     """
     A service to interact with Deepgram's APIs for Text-to-Speech and Speech-to-Text.
     """
     def __init__(self):
         self.client = DeepgramClient(settings.DEEPGRAM_API_KEY)
-        self.http_client = httpx.AsyncClient()
+        self.http_client = tts_http_client
         self.tts_url = "https://api.deepgram.com/v1/speak"
+        self._tts_base_params = {"encoding": "linear16", "sample_rate": 24000} # Headers live on the shared client
+        self._live_pool: Deque[LiveTranscription] = deque()
+        self.live_pool_max_size = 16
 
-    async def text_to_speech_stream(self, text: str, gender: str):
-        if gender.lower() == 'male':
-            model = random.choice(MALE_VOICES)
-        else:
-            model = random.choice(FEMALE_VOICES)
-
-        print(f"[DeepgramService] Requesting TTS for: '{text[:60]}...' (model: {model})")
-
-        headers = {
-            "Authorization": f"Token {settings.DEEPGRAM_API_KEY}",
-            "Content-Type": "application/json"
-        }
-        
-        params = {
-            "model": model,
-            "encoding": "linear16",
-            "sample_rate": 24000
-        }
-        
-        payload = {"text": text}
+    async def text_to_speech_stream(self, text: str, model: str):
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[DeepgramService] Requesting TTS for: '%s...' (model: %s)", text[:60], model)
+
+        params = {**self._tts_base_params, "model": model}
+        payload = orjson.dumps({"text": text})
 
         try:
-            async with self.http_client.stream("POST", self.tts_url, headers=headers, params=params, json=payload, timeout=60) as response:
+            async with self.http_client.stream("POST", self.tts_url, params=params, content=payload) as response:
                 if response.is_error:
                     error_body = await response.aread()
-                    print(f"[DeepgramService] Error from API: {response.status_code} - {error_body.decode()}")
+                    logger.error("[DeepgramService] Error from API: %s - %s", response.status_code, error_body.decode())
                     response.raise_for_status()
 
-                print(f"[DeepgramService] Success: {response.status_code}. Streaming audio...")
-                async for chunk in response.aiter_bytes():
+                logger.debug("[DeepgramService] Success: %s. Streaming audio...", response.status_code)
+                async for chunk in response.aiter_bytes(chunk_size=TTS_HTTP_CHUNK_BYTES):
                     yield chunk
-                print("[DeepgramService] Audio stream finished.")
+                logger.debug("[DeepgramService] Audio stream finished.")
 
         except httpx.RequestError as e:
-            print(f"[DeepgramService] HTTP Request Error: {e}")
+            logger.error("[DeepgramService] HTTP Request Error: %s", e)
         except Exception as e:
-            print(f"[DeepgramService] An unexpected error occurred: {e}")
+            logger.exception("[DeepgramService] An unexpected error occurred: %s", e)
         finally:
-            print(f"[DeepgramService] TTS function finished for: '{text[:60]}...'")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("[DeepgramService] TTS function finished for: '%s...'", text[:60])
+
+    def open_speak_stream(self, model: str) -> SpeakStream:
+        """Returns a persistent TTS stream for the given voice. It connects lazily on the first line."""
+        return SpeakStream(self, model)
+
+    async def close(self):
+        """Closes the shared HTTP client. Called on application shutdown."""
+        await self.http_client.aclose()
 
     def get_live_transcriber(self) -> "LiveTranscription":
         """
-        Returns an instance of the asynchronous LiveTranscription manager.
+        Returns an instance of the asynchronous LiveTranscription manager,
+        reusing an idle one from the pool when available.
         """
+        if self._live_pool:
+            return self._live_pool.pop()
         return LiveTranscription(self.client)
 
+    async def release_live_transcriber(self, transcriber: "LiveTranscription"):
+        """
+        Closes the transcriber's connection if still open and returns it to the pool.
+        """
+        await transcriber.recycle()
+        if len(self._live_pool) < self.live_pool_max_size:
+            self._live_pool.append(transcriber)
+
 # Singleton instance for easy access
 deepgram_service = DeepgramService()
\ No newline at end of file
@@ -1,30 +1,208 @@
 import asyncio
-import json
+import hashlib
+import logging
+import random
+import time
+import orjson
 from enum import Enum, auto
 from fastapi import WebSocket
-from typing import Dict, List, Optional
-from app.services.llm_service import generate_dialogue
-from app.services.deepgram_service import deepgram_service
+from collections import deque
+from contextlib import aclosing, suppress
+from itertools import islice
+from uuid import UUID
+from typing import AsyncIterator, Deque, Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.services.llm_service import DIALOGUE_CONFIG, generate_dialogue_stream, summarize_dialogue
+from app.services.deepgram_service import deepgram_service, pick_voice, SpeakStream
 from app.db.propaganda_db import get_propaganda_mission_by_id
 from app.db.mongodb_utils import get_database
 from app.schemas.propaganda import DialogueLine, Speaker
 
+logger = logging.getLogger(__name__)
+
+OUTBOX_MAX_SIZE = 64 # Pending frames per client before producers are back-pressured
+DIALOGUE_HISTORY_MAX_LINES = 200 # Hard cap on verbatim lines, e.g. while summaries keep failing
+DIALOGUE_HISTORY_RECENT_LINES = 40 # Latest lines always sent to the LLM verbatim
+DIALOGUE_HISTORY_FOLD_LINES = 16 # Older lines folded into the running summary at a time
+DIALOGUE_QUEUE_MAX_SIZE = 10 # Lines waiting for TTS; generation pauses while the queue is full
+AUDIO_FRAME_MAX_BYTES = 16384 # ~340 ms of 24 kHz linear16 per websocket frame
+AUDIO_FRAME_FLUSH_INTERVAL = 0.02 # Max seconds a buffered chunk waits for more audio before being sent
+DIALOGUE_RETRY_DELAY = 2.0 # Seconds to wait after a failed generation before asking the LLM again
+DIALOGUE_CACHE_TTL = 3600.0 # Seconds a generated batch is replayed for identical prompt inputs
+DIALOGUE_CACHE_MAX_SIZE = 1024
+DIALOGUE_LLM_CONCURRENCY = 8 # Dialogue generations running at once across all sessions
+GAME_SESSION_MAX_ACTIVE = 256 # Missions played at once per worker; further connects are refused
+GAME_SESSION_POOL_SIZE = 32 # Stopped sessions kept for reuse
+LISTENER_BROADCAST_INTERVAL = 1.0 # Seconds between awakened-listener checks, jittered by ±10%
+
+# Fixed protocol messages, encoded once. They stay text frames: binary frames are audio.
+MISSION_NOT_FOUND_MESSAGE = orjson.dumps({"error": "Mission not found."}).decode()
+MISSION_NOT_READY_MESSAGE = orjson.dumps({"error": "Mission not ready."}).decode()
+AWAKENED_LISTENERS_TEMPLATE = '{"awakened_listeners":%d}'
+
+# Busy sessions queue here for a generation slot instead of all hitting Gemini at once.
+_dialogue_llm_slots = asyncio.Semaphore(DIALOGUE_LLM_CONCURRENCY)
+
+# Completed batches keyed by a hash of the exact prompt inputs. A cached batch is only a valid
+# answer if the model would give the same one again, so the cache is off unless enabled and
+# dialogue is sampled greedily.
+DIALOGUE_CACHE_ENABLED = settings.DIALOGUE_CACHE_ENABLED and DIALOGUE_CONFIG.temperature == 0
+_dialogue_cache: Dict[bytes, Tuple[float, List[DialogueLine]]] = {}
+
+def _dialogue_cache_key(mission_context: str, dialogue_history: str, proof_sentences: List[str]) -> bytes:
+    return hashlib.sha256("\x1f".join((mission_context, dialogue_history, *proof_sentences)).encode()).digest()
+
+async def coalesce_audio(
+    chunks: AsyncIterator[bytes],
+    max_bytes: int = AUDIO_FRAME_MAX_BYTES,
+    flush_interval: float = AUDIO_FRAME_FLUSH_INTERVAL,
+) -> AsyncIterator[bytes]:
+    """
+    Merges small TTS chunks into larger frames, so the client gets fewer, bigger
+    websocket messages. A partial frame is flushed once it has waited flush_interval.
+    """
+    loop = asyncio.get_running_loop()
+    iterator = chunks.__aiter__()
+    buffer = bytearray()
+    deadline = 0.0
+    pending: Optional[asyncio.Future] = None
+    try:
+        while True:
+            if pending is None:
+                pending = asyncio.ensure_future(iterator.__anext__())
+            timeout = max(0.0, deadline - loop.time()) if buffer else None
+            done, _ = await asyncio.wait({pending}, timeout=timeout)
+            if not done:
+                yield bytes(buffer)
+                buffer.clear()
+                continue
+
+            next_chunk, pending = pending, None
+            try:
+                chunk = next_chunk.result()
+            except StopAsyncIteration:
+                break
+            if not buffer:
+                deadline = loop.time() + flush_interval
+            buffer += chunk
+            while len(buffer) >= max_bytes:
+                yield bytes(buffer[:max_bytes])
+                del buffer[:max_bytes]
+                deadline = loop.time() + flush_interval
+
+        if buffer:
+            yield bytes(buffer)
+    finally:
+        if pending is not None:
+            # Let the source finish unwinding before our caller closes it.
+            pending.cancel()
+            with suppress(asyncio.CancelledError, Exception):
+                await pending
+
 class ConnectionManager:
-    """Manages active WebSocket connections."""
+    """
+    Manages active WebSocket connections. Each connection gets a bounded outbox
+    drained by a single writer task, so producers never contend on the socket.
+    """
     def __init__(self):
         self.active_connections: Dict[str, WebSocket] = {}
+        self._outboxes: Dict[str, asyncio.Queue[str | bytes]] = {}
+        self._writers: Dict[str, asyncio.Task] = {}
 
     async def connect(self, websocket: WebSocket, mission_id: str):
         await websocket.accept()
+        # A newer connection for the mission takes over; the old writer would otherwise
+        # wait on its orphaned outbox forever.
+        self.disconnect(mission_id)
         self.active_connections[mission_id] = websocket
+        outbox: asyncio.Queue[str | bytes] = asyncio.Queue(maxsize=OUTBOX_MAX_SIZE)
+        self._outboxes[mission_id] = outbox
+        self._writers[mission_id] = asyncio.create_task(self._writer(websocket, outbox))
 
-    def disconnect(self, mission_id: str):
-        if mission_id in self.active_connections:
-            del self.active_connections[mission_id]
+    def disconnect(self, mission_id: str, websocket: Optional[WebSocket] = None):
+        """Drops the mission's connection. If `websocket` is given, only if it is still the current one."""
+        if websocket is not None and self.active_connections.get(mission_id) is not websocket:
+            return # Already replaced by a newer connection
+        self.active_connections.pop(mission_id, None)
+        writer = self._writers.pop(mission_id, None)
+        if writer is not None:
+            writer.cancel()
+        outbox = self._outboxes.pop(mission_id, None)
+        if outbox is not None:
+            # Nothing reads this queue any more. Emptying it wakes producers blocked on a full
+            # outbox; their next lookup finds the new one, or none.
+            self._drain(outbox)
 
     async def send_to_client(self, message: str, mission_id: str):
-        if mission_id in self.active_connections:
-            await self.active_connections[mission_id].send_text(message)
+        outbox = self._outboxes.get(mission_id)
+        if outbox is not None:
+            await outbox.put(message)
+
+    async def send_bytes_to_client(self, data: bytes, mission_id: str):
+        outbox = self._outboxes.get(mission_id)
+        if outbox is not None:
+            await outbox.put(data)
+
+    def get_outbox(self, mission_id: str) -> Optional[asyncio.Queue[str | bytes]]:
+        """
+        Returns the client's current outbox, for producers that send many frames in a row, or
+        None once the client is gone. A reconnect replaces it, so don't hold on to it across frames.
+        """
+        return self._outboxes.get(mission_id)
+
+    def clear_pending(self, mission_id: str):
+        """Drops frames that are queued but not yet sent, e.g. audio for an interrupted line."""
+        outbox = self._outboxes.get(mission_id)
+        if outbox:
+            self._drain(outbox)
+
+    @staticmethod
+    def _drain(outbox: asyncio.Queue[str | bytes]):
+        while not outbox.empty():
+            outbox.get_nowait()
+
+    async def _writer(self, websocket: WebSocket, outbox: asyncio.Queue[str | bytes]):
+        """Sends queued frames to the client in order until cancelled or the socket fails."""
+        try:
+            while True:
+                message = await outbox.get()
+                if isinstance(message, bytes):
+                    await websocket.send_bytes(message)
+                else:
+                    await websocket.send_text(message)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error("Error writing to websocket: %s", e)
+
+class PrefetchedSpeech:
+    """
+    Synthesizes one dialogue line in the background and buffers its audio, so the
+    next line's TTS can start while the current line is still streaming.
+    """
+    def __init__(self, dialogue_line: DialogueLine, speak_stream: SpeakStream):
+        self.dialogue_line = dialogue_line
+        self._chunks: asyncio.Queue[Optional[bytes]] = asyncio.Queue()
+        self._task = asyncio.create_task(self._synthesize(speak_stream))
+
+    async def _synthesize(self, speak_stream: SpeakStream):
+        try:
+            async with aclosing(speak_stream.speak(self.dialogue_line.line)) as tts_stream:
+                async for chunk in tts_stream:
+                    self._chunks.put_nowait(chunk)
+        finally:
+            self._chunks.put_nowait(None)
+
+    async def audio(self) -> AsyncIterator[bytes]:
+        """Yields the line's audio as it becomes available."""
+        while True:
+            chunk = await self._chunks.get()
+            if chunk is None:
+                return
+            yield chunk
+
+    def cancel(self):
+        self._task.cancel()
 
 class SessionState(Enum):
     IDLE = auto()
@@ -37,35 +215,99 @@ class GameSession:
     to prevent race conditions and overlapping audio.
     """
     def __init__(self, mission_id: str, manager: ConnectionManager):
+        # Containers and connections are created once and kept across reuse from the pool.
+        self.dialogue_queue: asyncio.Queue[DialogueLine] = asyncio.Queue(maxsize=DIALOGUE_QUEUE_MAX_SIZE)
+        self._speaker_voices: Dict[str, str] = {} # Speaker name -> TTS voice, fixed for the session
+        self._speak_streams: Dict[str, SpeakStream] = {} # TTS voice -> persistent Deepgram TTS websocket
+        self._history_parts: Deque[str] = deque(maxlen=DIALOGUE_HISTORY_MAX_LINES)
+        self._wake = asyncio.Event() # Set whenever the main loop may have something new to do
+        self._live_transcriber = deepgram_service.get_live_transcriber()
+        self.reset(mission_id, manager)
+
+    def reset(self, mission_id: str, manager: ConnectionManager):
+        """Clears all per-mission state in place, so a stopped session can be reused from the pool."""
         self.mission_id = mission_id
         self.manager = manager
-        self.dialogue_queue: asyncio.Queue[DialogueLine] = asyncio.Queue()
-        self.speakers: List[Speaker] = []
-        self.dialogue_history = ""
+        self._drain_dialogue_queue()
+        self.speakers: List[Speaker] = [] # Rebound to the mission's list in start(), never mutated
+        self._speaker_voices.clear()
+        self._speak_streams.clear() # Closed by stop()
+        self._prefetched: Optional[PrefetchedSpeech] = None # TTS already under way for the next queued line
+        self._history_parts.clear()
+        self._history_summary = "" # Running summary of the lines folded out of _history_parts
         self.mission_context = ""
         self.proof_sentences: List[str] = []
         self.initial_listeners: int = 0 # New: Store initial listeners
         self._awakened_listeners: float = 0.0 # New: Track awakened listeners
         
         self._is_active = True
-        self._state = SessionState.IDLE
-        self._state_lock = asyncio.Lock()
+        self._started = False
+        self._state = SessionState.IDLE # Only changed between awaits, so no lock is needed
+        self._wake.clear()
         
         self._main_task: Optional[asyncio.Task] = None
         self._tts_task: Optional[asyncio.Task] = None
+        self._generation_task: Optional[asyncio.Task] = None # Streams the next LLM batch into dialogue_queue
         self._listener_broadcast_task: Optional[asyncio.Task] = None # New: Task for broadcasting listeners
-        
-        self._live_transcriber = deepgram_service.get_live_transcriber()
+        self._summary_task: Optional[asyncio.Task] = None # Folds the oldest history lines into _history_summary
+
+    @property
+    def dialogue_history(self) -> str:
+        """
+        The conversation as fed to the dialogue LLM: a short summary of the older part, then
+        the most recent lines verbatim, oldest first.
+        """
+        recent = "".join(self._history_parts)
+        if self._history_summary:
+            return f"(Earlier in the show: {self._history_summary})" + recent
+        return recent
+
+    def _append_history(self, entry: str):
+        """
+        Records a conversation line. Once enough lines have built up, the oldest block is
+        summarized in the background. Folding a whole block at a time keeps the history's
+        start unchanged between folds, so the prompt prefix stays cacheable.
+        """
+        self._history_parts.append(entry)
+        if len(self._history_parts) >= DIALOGUE_HISTORY_RECENT_LINES + DIALOGUE_HISTORY_FOLD_LINES and (
+            self._summary_task is None or self._summary_task.done()
+        ):
+            lines = list(islice(self._history_parts, DIALOGUE_HISTORY_FOLD_LINES))
+            self._summary_task = asyncio.create_task(self._fold_history(lines))
+
+    async def _fold_history(self, lines: List[str]):
+        try:
+            summary = await summarize_dialogue(self._history_summary, "".join(lines))
+        except Exception as e:
+            logger.warning("[GameSession] Could not summarize older dialogue: %s", e)
+            return # Lines stay verbatim; the next append tries again
+        # Only appends happen meanwhile, but those can push folded lines out through maxlen.
+        # Drop a folded line only if it is still the oldest entry (the same string object),
+        # so a newer, unsummarized line is never removed in its place.
+        for line in lines:
+            if self._history_parts and self._history_parts[0] is line:
+                self._history_parts.popleft()
+        self._history_summary = summary
 
     async def start(self):
-        print(f"Game session starting for mission {self.mission_id}")
+        """Loads the mission and starts the dialogue. Does nothing if the session is already started."""
+        if self._started:
+            return
+        self._started = True
+        logger.info("Game session starting for mission %s", self.mission_id)
+        try:
+            mission_uuid = UUID(self.mission_id)
+        except ValueError:
+            await self.manager.send_to_client(MISSION_NOT_FOUND_MESSAGE, self.mission_id)
+            return
         db = await get_database()
-        mission = await get_propaganda_mission_by_id(self.mission_id, db)
+        mission = await get_propaganda_mission_by_id(mission_uuid, db)
         if not mission or not mission.dialogue_generator_prompt:
-            await self.manager.send_to_client(json.dumps({"error": "Mission not ready."}), self.mission_id)
+            await self.manager.send_to_client(MISSION_NOT_READY_MESSAGE, self.mission_id)
             return
         
         self.speakers = mission.generation_result.speakers
+        self._speaker_voices.update((s.name, pick_voice(s.gender)) for s in self.speakers)
         self.mission_context = mission.dialogue_generator_prompt
         self.proof_sentences = mission.generation_result.proof_sentences
         self.initial_listeners = mission.generation_result.initial_listeners # New: Set initial listeners
@@ -75,10 +317,10 @@ class GameSession:
         self._listener_broadcast_task = asyncio.create_task(self._broadcast_listeners_loop()) # New: Start broadcast task
 
     async def stop(self):
-        print(f"Stopping game session for mission {self.mission_id}")
+        logger.info("Stopping game session for mission %s", self.mission_id)
         self._is_active = False
         
-        tasks_to_cancel = [self._main_task, self._tts_task, self._listener_broadcast_task] # New: Add broadcast task to cancel list
+        tasks_to_cancel = [self._main_task, self._generation_task, self._tts_task, self._listener_broadcast_task, self._summary_task] # New: Add broadcast task to cancel list
         for task in tasks_to_cancel:
             if task and not task.done():
                 task.cancel()
@@ -87,27 +329,31 @@ class GameSession:
                 except asyncio.CancelledError:
                     pass
         
-        if self._live_transcriber._is_active:
-            await self._live_transcriber.stop()
+        self._discard_prefetched()
+        await self._live_transcriber.recycle() # Kept for reuse; the pool releases it if the session is dropped
+        for speak_stream in self._speak_streams.values():
+            await speak_stream.close()
+        self._speak_streams.clear()
             
-        print("Game session tasks cancelled successfully.")
+        logger.debug("Game session tasks cancelled successfully.")
 
     async def signal_ready_for_next(self):
         """Triggers the next action in the main loop if the session is idle."""
-        pass # Main loop is now continuous, no need to trigger it here
+        self._wake.set() # Only wakes the one long-lived main loop; never starts another
 
     async def start_user_speech(self):
         """Transitions the state to listening, cancelling any ongoing TTS."""
-        async with self._state_lock:
-            if self._state == SessionState.SPEAKING_TTS and self._tts_task:
-                self._tts_task.cancel()
+        if self._state == SessionState.SPEAKING_TTS and self._tts_task:
+            self._tts_task.cancel()
+            self.manager.clear_pending(self.mission_id)
             
-            self._state = SessionState.LISTENING_TO_USER
-            print("[GameSession] State changed to LISTENING_TO_USER")
+        self._state = SessionState.LISTENING_TO_USER
+        logger.debug("[GameSession] State changed to LISTENING_TO_USER")
             
-            while not self.dialogue_queue.empty():
-                self.dialogue_queue.get_nowait()
-            print("[GameSession] Dialogue queue cleared for user speech.")
+        self._cancel_generation()
+        self._drain_dialogue_queue()
+        self._discard_prefetched()
+        logger.debug("[GameSession] Dialogue queue cleared for user speech.")
 
         await self._live_transcriber.start()
 
@@ -116,19 +362,19 @@ class GameSession:
         Stops the transcriber, processes the final transcript, and triggers the next
         dialogue generation. This is the single point of truth for ending user speech.
         """
-        print("[GameSession] User speech stopped.")
+        logger.debug("[GameSession] User speech stopped.")
         if not self._live_transcriber._is_active:
             return
 
         transcript = await self._live_transcriber.stop()
         
-        async with self._state_lock:
-            if transcript:
-                print(f"[GameSession] Final transcript processed: '{transcript}'")
-                self.dialogue_history += f"\nUser: {transcript}"
+        if transcript:
+            logger.info("[GameSession] Final transcript processed: '%s'", transcript)
+            self._append_history(f"\nUser: {transcript}")
             
-            self._state = SessionState.IDLE
-            print("[GameSession] State changed to IDLE")
+        self._state = SessionState.IDLE
+        self._wake.set()
+        logger.debug("[GameSession] State changed to IDLE")
         
         # The continuous _main_loop will pick up from here
 
@@ -137,82 +383,174 @@ class GameSession:
         Handles incoming user dialogue, interrupts current TTS, clears the queue,
         and appends the user's message to the history to influence the next generation.
         """
-        print(f"[GameSession] Handling user dialogue: '{dialogue}'")
-        async with self._state_lock:
-            if self._state == SessionState.SPEAKING_TTS and self._tts_task:
-                self._tts_task.cancel()
-                print("[GameSession] Cancelled running TTS task due to user dialogue.")
+        logger.info("[GameSession] Handling user dialogue: '%s'", dialogue)
+        if self._state == SessionState.SPEAKING_TTS and self._tts_task:
+            self._tts_task.cancel()
+            self.manager.clear_pending(self.mission_id)
+            logger.debug("[GameSession] Cancelled running TTS task due to user dialogue.")
 
-            # Clear any pending dialogue
-            while not self.dialogue_queue.empty():
-                self.dialogue_queue.get_nowait()
-            print("[GameSession] Dialogue queue cleared.")
+        # Clear any pending dialogue
+        self._cancel_generation()
+        self._drain_dialogue_queue()
+        self._discard_prefetched()
+        logger.debug("[GameSession] Dialogue queue cleared.")
 
-            # Append user dialogue to history
-            self.dialogue_history += f"\nUser: {dialogue}"
+        # Append user dialogue to history
+        self._append_history(f"\nUser: {dialogue}")
             
-            # Set state to IDLE, the main loop will now generate new dialogue
-            self._state = SessionState.IDLE
-            print("[GameSession] State set to IDLE to trigger new dialogue generation.")
+        # Set state to IDLE, the main loop will now generate new dialogue
+        self._state = SessionState.IDLE
+        self._wake.set()
+        logger.debug("[GameSession] State set to IDLE to trigger new dialogue generation.")
+
+    def _speak_stream_for(self, speaker_name: str) -> SpeakStream:
+        """Returns the persistent TTS stream for the speaker's voice, opening it on first use."""
+        voice = self._speaker_voices.get(speaker_name)
+        if voice is None:
+            # Unknown speaker from the LLM: give it a stable voice for the rest of the session.
+            voice = self._speaker_voices[speaker_name] = pick_voice("female")
+        
+        speak_stream = self._speak_streams.get(voice)
+        if speak_stream is None:
+            speak_stream = self._speak_streams[voice] = deepgram_service.open_speak_stream(voice)
+        return speak_stream
+
+    def _cancel_generation(self):
+        """Stops a batch still streaming in; its lines were written before the latest user input."""
+        if self._generation_task and not self._generation_task.done():
+            self._generation_task.cancel()
+        self._generation_task = None
+
+    def _drain_dialogue_queue(self):
+        """
+        Drops every queued line. Call after _cancel_generation(), so no producer is blocked
+        on put(). Each dropped line is marked done, keeping join() usable; the line currently
+        playing calls task_done() itself.
+        """
+        while not self.dialogue_queue.empty():
+            self.dialogue_queue.get_nowait()
+            self.dialogue_queue.task_done()
+
+    def _discard_prefetched(self):
+        if self._prefetched:
+            self._prefetched.cancel()
+            self._prefetched = None
+
+    def _prefetch_next_line(self):
+        """Starts TTS for the line queued after the one about to play, if there is one."""
+        if self._prefetched is None and not self.dialogue_queue.empty():
+            next_line = self.dialogue_queue._queue[0] # type: ignore[attr-defined]
+            self._prefetched = PrefetchedSpeech(next_line, self._speak_stream_for(next_line.speaker_name))
 
     async def _stream_tts_for_line(self, dialogue_line: DialogueLine):
         """Streams TTS for a single line. This is a self-contained task."""
+        speech: Optional[PrefetchedSpeech] = None
         try:
 
             speaker_name = dialogue_line.speaker_name
             line_text = dialogue_line.line
-            print(f"[GameSession] Speaking ({speaker_name}): {line_text}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("[GameSession] Speaking (%s): %s", speaker_name, line_text)
             
-            speaker_gender = next((s.gender for s in self.speakers if s.name == speaker_name), "female")
+            if self._prefetched and self._prefetched.dialogue_line is dialogue_line:
+                speech, self._prefetched = self._prefetched, None
+            else:
+                self._discard_prefetched()
+                speech = PrefetchedSpeech(dialogue_line, self._speak_stream_for(speaker_name))
+            self._prefetch_next_line()
             
-            tts_stream = deepgram_service.text_to_speech_stream(line_text, speaker_gender)
-            async for chunk in tts_stream:
-                await self.manager.active_connections[self.mission_id].send_bytes(chunk)
+            async with aclosing(coalesce_audio(speech.audio())) as frames:
+                async for frame in frames:
+                    # Looked up per frame: a reconnect mid-line replaces the outbox.
+                    outbox = self.manager.get_outbox(self.mission_id)
+                    if outbox is None:
+                        return # Client already gone
+                    await outbox.put(frame)
+            speech = None
             
-            self.dialogue_history += f"\n{speaker_name}: {line_text}"
-            print(f"[GameSession] Finished streaming TTS for line: '{line_text}'")
+            self._append_history(f"\n{speaker_name}: {line_text}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("[GameSession] Finished streaming TTS for line: '%s'", line_text)
             
 
         except asyncio.CancelledError:
-            print(f"[GameSession] TTS for '{dialogue_line.line[:30]}...' was cancelled.")
+            logger.debug("[GameSession] TTS for '%s...' was cancelled.", dialogue_line.line[:30])
         except Exception as e:
-            print(f"Error during TTS streaming: {e}")
+            logger.error("Error during TTS streaming: %s", e)
         finally:
+            if speech:
+                speech.cancel()
             self.dialogue_queue.task_done()
 
+    async def _dialogue_lines(self, upcoming: Optional[DialogueLine] = None) -> AsyncIterator[DialogueLine]:
+        """
+        Yields the next LLM batch line by line, as the model streams it. `upcoming` is a line
+        still playing, treated as already said.
+        """
+        mission_context, dialogue_history, proof_sentences = self.mission_context, self.dialogue_history, self.proof_sentences
+        if upcoming is not None:
+            dialogue_history += f"\n{upcoming.speaker_name}: {upcoming.line}"
+        cache_key = _dialogue_cache_key(mission_context, dialogue_history, proof_sentences) if DIALOGUE_CACHE_ENABLED else None
+        cached = _dialogue_cache.get(cache_key) if cache_key else None
+        if cached and time.monotonic() - cached[0] < DIALOGUE_CACHE_TTL:
+            for dialogue in cached[1]:
+                yield dialogue
+            return
+
+        batch: List[DialogueLine] = []
+        async with _dialogue_llm_slots:
+            async with aclosing(generate_dialogue_stream(mission_context, dialogue_history, proof_sentences)) as dialogues:
+                async for dialogue in dialogues:
+                    batch.append(dialogue)
+                    yield dialogue
+
+        if cache_key and batch:
+            if len(_dialogue_cache) >= DIALOGUE_CACHE_MAX_SIZE:
+                _dialogue_cache.pop(next(iter(_dialogue_cache)))
+            _dialogue_cache[cache_key] = (time.monotonic(), batch)
+
+    async def _generate_dialogue_batch(self, upcoming: Optional[DialogueLine] = None):
+        """Queues the next batch of dialogue, making each line available to TTS as soon as it arrives."""
+        logger.debug("[GameSession] Dialogue queue empty. Generating new batch...")
+        count = 0
+        try:
+            async with aclosing(self._dialogue_lines(upcoming)) as dialogues:
+                async for dialogue in dialogues:
+                    await self.dialogue_queue.put(dialogue)
+                    self._prefetch_next_line()
+                    self._wake.set()
+                    count += 1
+            
+            if count:
+                logger.debug("[GameSession] Generated dialogue batch size: %d", count)
+            else:
+                logger.warning("[GameSession] Failed to generate new dialogues.")
+                await asyncio.sleep(DIALOGUE_RETRY_DELAY) # Main loop won't start another batch until this task ends
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error("Error generating dialogue: %s", e)
+            await asyncio.sleep(DIALOGUE_RETRY_DELAY)
+        finally:
+            self._wake.set() # Let the main loop start the next batch once this one has drained
+
     async def _main_loop(self):
         """
-        The core logic loop. It continuously processes dialogue and manages TTS playback sequentially.
+        The core logic loop. It continuously processes dialogue and manages TTS playback sequentially,
+        while the next batch streams in from the LLM on a separate task, started as the previous
+        batch's last line begins to play.
         """
         while self._is_active:
             if self._state == SessionState.IDLE:
-                if self.dialogue_queue.empty():
-                    # If idle and queue is empty, generate new dialogue.
-                    print("[GameSession] Dialogue queue empty. Generating new batch...")
-                    # Temporarily block state during generation.
-                    async with self._state_lock:
-                        self._state = SessionState.SPEAKING_TTS
-                    
-                    new_dialogues = await asyncio.to_thread(
-                        generate_dialogue, self.mission_context, self.dialogue_history, self.proof_sentences
-                    )
-                    
-                    if new_dialogues:
-                        print(f"[GameSession] Generated dialogue batch size: {len(new_dialogues)}")
-                        for dialogue in new_dialogues:
-                            await self.dialogue_queue.put(dialogue)
-                    else:
-                        print("[GameSession] Failed to generate new dialogues.")
-                    
-                    # Revert to IDLE to allow the loop to pick up the new dialogue.
-                    async with self._state_lock:
-                        self._state = SessionState.IDLE
-                else:
+                if not self.dialogue_queue.empty():
                     # If idle and queue has items, speak the next line.
-                    async with self._state_lock:
-                        self._state = SessionState.SPEAKING_TTS
+                    self._state = SessionState.SPEAKING_TTS
                     
                     dialogue_line = await self.dialogue_queue.get()
+                    if self.dialogue_queue.empty() and (self._generation_task is None or self._generation_task.done()):
+                        # Last line of the batch: generate the next batch while it plays, rather than
+                        # after. An interruption cancels this like any other generation.
+                        self._generation_task = asyncio.create_task(self._generate_dialogue_batch(upcoming=dialogue_line))
                     self._tts_task = asyncio.create_task(self._stream_tts_for_line(dialogue_line))
                     
                     try:
@@ -220,32 +558,97 @@ class GameSession:
                         await self._tts_task
                     except asyncio.CancelledError:
                         # If cancelled, the cancelling function is responsible for the state change.
-                        print("[GameSession] TTS task was externally cancelled.")
+                        logger.debug("[GameSession] TTS task was externally cancelled.")
                     else:
-                        # If it finished normally, revert to IDLE for the next line.
-                        async with self._state_lock:
+                        # If it finished normally, revert to IDLE for the next line, unless the
+                        # user took over while this loop was waiting to resume.
+                        if self._state == SessionState.SPEAKING_TTS:
                             self._state = SessionState.IDLE
+                    continue
+                
+                if self._generation_task is None or self._generation_task.done():
+                    # If idle, the queue is empty and nothing is streaming in, generate new dialogue.
+                    self._generation_task = asyncio.create_task(self._generate_dialogue_batch())
             
-            # Wait a bit before the next check to prevent busy-waiting.
-            await asyncio.sleep(0.1)
+            # Sleep until a state change, a newly queued line or the end of a batch.
+            await self._wake.wait()
+            self._wake.clear()
 
     async def _broadcast_listeners_loop(self):
-        """Periodically sends the current awakened listener count to the client."""
+        """Periodically sends the awakened listener count to the client, whenever it has changed."""
+        last_sent: Optional[int] = None
         while self._is_active:
             try:
                 # Clamp awakened listeners between 0 and initial_listeners
                 clamped_listeners = max(0, min(self.initial_listeners, int(self._awakened_listeners)))
                 
-                message = json.dumps({"awakened_listeners": clamped_listeners})
-                await self.manager.send_to_client(message, self.mission_id)
-                print(f"[GameSession] Sent awakened listeners: {clamped_listeners}")
+                if clamped_listeners != last_sent:
+                    message = AWAKENED_LISTENERS_TEMPLATE % clamped_listeners
+                    await self.manager.send_to_client(message, self.mission_id)
+                    last_sent = clamped_listeners
+                    logger.debug("[GameSession] Sent awakened listeners: %d", clamped_listeners)
             except Exception as e:
-                print(f"Error broadcasting listeners: {e}")
+                logger.error("Error broadcasting listeners: %s", e)
             
-            await asyncio.sleep(1) # Send every second
+            # Jittered, so sessions started together don't all wake on the same tick and
+            # queue their work in front of other sessions' audio.
+            await asyncio.sleep(LISTENER_BROADCAST_INTERVAL * random.uniform(0.9, 1.1))
+
+class GameSessionPool:
+    """
+    Tracks the active game session for each mission, counting the clients playing it, and
+    recycles stopped sessions through a bounded free list. Sessions are reset in place, so
+    their queue, buffers and live transcriber are reused rather than rebuilt.
+    """
+    def __init__(self, max_active: int = GAME_SESSION_MAX_ACTIVE, max_size: int = GAME_SESSION_POOL_SIZE):
+        self.max_active = max_active
+        self.max_size = max_size
+        self.active: Dict[str, GameSession] = {}
+        self._clients: Dict[GameSession, int] = {}
+        self._free: Deque[GameSession] = deque()
+
+    def get(self, mission_id: str) -> Optional[GameSession]:
+        return self.active.get(mission_id)
+
+    def acquire(self, mission_id: str, manager: ConnectionManager) -> Optional[GameSession]:
+        """
+        Returns the mission's session for one more client, creating or reusing one if the
+        mission has none. Returns None if that would exceed max_active sessions.
+        """
+        session = self.active.get(mission_id)
+        if session is None:
+            if len(self.active) >= self.max_active:
+                return None
+            if self._free:
+                session = self._free.pop()
+                session.reset(mission_id, manager)
+            else:
+                session = GameSession(mission_id, manager)
+            self.active[mission_id] = session
+        self._clients[session] = self._clients.get(session, 0) + 1
+        return session
+
+    async def release(self, session: GameSession):
+        """
+        Drops one client from the session. Once the last client has left, the session is
+        stopped and returned to the free list if there is room.
+        """
+        clients = self._clients.get(session, 0) - 1
+        if clients > 0:
+            self._clients[session] = clients
+            return
+        self._clients.pop(session, None)
+        if self.active.get(session.mission_id) is session:
+            del self.active[session.mission_id]
+        await session.stop()
+        if len(self._free) < self.max_size:
+            self._free.append(session)
+        else:
+            await deepgram_service.release_live_transcriber(session._live_transcriber)
 
-# A dictionary to hold active game sessions
-game_sessions: Dict[str, GameSession] = {}
+# Active game sessions, keyed by mission id. Per process: with several workers,
+# the load balancer must route each mission's websocket to the same worker.
+session_pool = GameSessionPool()
 
 # Singleton instance of the connection manager
 manager = ConnectionManager()
\ No newline at end of file
@@ -1,8 +1,19 @@
-from typing import List
+import asyncio
+import json
+import logging
+import re
+import time
+import httpx
+from contextlib import aclosing
+from functools import lru_cache
+from typing import AsyncIterable, AsyncIterator, Callable, List, Set, Tuple
 from google import genai
-from google.genai import types
+from google.genai import errors, types
+from pydantic import ValidationError
 from app.core.config import settings
-from app.schemas.propaganda import PropagandaGenerationResult, DialogueLine, DialogueTurn
+from app.schemas.propaganda import PropagandaGenerationResult, DialogueLine, DialogueTurn, Speaker
+
+logger = logging.getLogger(__name__)
 
 # --- Generic Prompt Templates ---
 
@@ -24,14 +35,12 @@ If the hacker presents a valid point (which might be one of the 'Secret Key Poin
 - **Patriotism/Nationalism:** Framing the hacker's actions as unpatriotic or harmful to the nation.
 
 **Core Rules for Hosts' Dialogue:**
-1.  **Propaganda Focus:** All dialogue from the hosts must consistently reinforce the state's propaganda and narrative. They are not to question or debunk it.
-2.  **Secret Key Points:** The hosts **must never mention or allude to the 'Secret Key Points'**. These are strictly for the hacker.
-3.  **Dialogue Generation:** Generate a minimum of 1 and a maximum of 7 dialogue lines at once.
-4.  **Speaker Attribution:** Each line of dialogue MUST be attributed to one of the provided speakers.
-5.  **Tone:** The hosts' dialogue should be professional, confident, and stoic, maintaining an authoritative tone appropriate for a public broadcast.
-6.  **Factual Consistency (Hosts):** The hosts will only present information consistent with the state's narrative. They will not tolerate or acknowledge any "false information" (from their perspective) or claims that contradict the established propaganda.
-
-NOTE: The dialogues should be in simple language, suitable for a wide audience, and should not include complex jargon or technical terms that might alienate listeners. Sometimes, allow ridiculous or absurd statements to highlight the absurdity of the propaganda, but always keep it within the limits of plausible state-sponsored story. Use simple vocabulary like that of a 10-year-old child, but maintain a professional tone.
+1.  **Dialogue Generation:** Generate a minimum of 3 and a maximum of 7 dialogue lines at once.
+2.  **Speaker Attribution:** Each line of dialogue MUST be attributed to one of the provided speakers.
+3.  **Tone:** Professional, confident, and stoic, with the authoritative tone of a public broadcast.
+4.  **Factual Consistency (Hosts):** The hosts only present information consistent with the state's narrative and never acknowledge claims that contradict it.
+
+NOTE: Use simple words a 10-year-old would understand, with no jargon, while keeping the professional tone. Sometimes allow ridiculous or absurd statements that highlight the absurdity of the propaganda, within the limits of a plausible state-sponsored story.
 """
 GENERIC_AWAKENING_INSTRUCTIONS = """
 **Hacker Response Analysis:**
@@ -40,121 +49,455 @@ Based on the hacker's last statement, you must determine the percentage of liste
 - Provide this as a floating-point number in the `awakened_listeners_change` field.
 """
 
+# Dialogue prompts, with the generic parts resolved once at import. The system instruction
+# holds everything fixed for a mission; only the conversation in the prompt changes per turn.
+DIALOGUE_SYSTEM_TEMPLATE = (
+    GENERIC_DIALOGUE_INSTRUCTIONS
+    + "\n\nSecret Key Points:\n{proofs}\n\n"
+    + GENERIC_AWAKENING_INSTRUCTIONS
+    + "\n\n**Show & Character Briefing:**\n{mission_context}"
+)
+DIALOGUE_PROMPT_TEMPLATE = (
+    "**Previous Conversation:**\n"
+    "{dialogue_history}\n\n"
+    "**Your Task:**\n"
+    "Based on all the information above, generate the next turn of the conversation. The output must be a valid JSON object matching the required schema. The conversation should flow naturally."
+)
+
+# --- Mission Setup Prompts ---
+# Static text comes first in every request, so calls share an identical prefix for Gemini's
+# implicit caching; only the short per-mission part at the end varies.
+
+STAGE1_INSTRUCTIONS = (
+    "You are a producer for a state-sponsored radio talk show. Your task is to create the foundational elements for a propaganda segment. The entire purpose of this radio show is to manipulate public opinion and reinforce the state's narrative. You must create two conflicting sets of information: the **propaganda** that the hosts will spread, and the **hidden truth** that a hacker character can use to debunk it.\n\n"
+    "**Your Task:**\n"
+    "Generate the following components as a valid JSON object. Be creative and ensure the propaganda and the truth are compelling and contradictory.\n\n"
+    "1.  **`topic` (The Propaganda Topic):**\n"
+    "    - Follow the topic instruction given after these instructions.\n\n"
+    "2.  **`summary` (The Propaganda Narrative):**\n"
+    "    - Write a 2-3 sentence summary of the radio show's official, manipulative narrative on the topic. This is the story the hosts will be pushing. It should sound plausible but be fundamentally misleading.\n\n"
+    "3.  **`speakers` (The Propaganda Mouthpieces):**\n"
+    "    - Create a list of 2 to 4 speakers who will appear on the show.\n"
+    "    - Their **name**, **gender**, **role**, and **background** MUST be designed to lend credibility to the propaganda narrative. They should be staunch supporters of the state's view.\n\n"
+    "4.  **`proof_sentences` (The Hidden Truth for the Hacker):**\n"
+    "    - Create a list of 3-5 'Secret Key Points'. These are the **actual facts** of the story that contradict the propaganda narrative. \n"
+    "    - These sentences are the ammunition for the hacker character. They should be specific, verifiable-sounding pieces of information that can be used to expose the hosts' lies.\n\n"
+    "5.  **`initial_listeners`:**\n"
+    "    - Provide a realistic integer for the number of initial listeners (e.g., between 50,000 and 250,000)."
+)
+STAGE1_PROVIDED_TOPIC = '**Provided Topic:** "{topic}"\nUse the provided topic for the `topic` field.'
+STAGE1_INVENTED_TOPIC = (
+    "**Topic Generation:** You must invent a topic for the propaganda segment. It should be simple, easy to understand, and clearly a form of propaganda in disguise. Examples could be about a new mandatory 'civic wellness' program, the 'benefits' of constant state surveillance for public safety, or a fabricated 'imminent threat' from a neighboring region that requires national unity.\n"
+    "Put the topic you invent in the `topic` field."
+)
+
+BRIEFING_INSTRUCTIONS = (
+    "You are a script director for a dystopian state-sponsored propaganda radio show. Your task is to create the detailed character briefings for the dialogue generation AI. The show's entire purpose is to push a specific, state-approved narrative.\n\n"
+    "**Your Task:**\n"
+    "Based on the show's narrative and the character roles given after these instructions, write a detailed 'Show & Character Briefing'. This briefing must define the personality, style, and unwavering pro-state perspective for EACH character. They are propagandists, not debaters. Their goal is to reinforce the narrative, not to explore other viewpoints. This briefing will be used by another AI to generate their dialogue, so be specific and clear about their mission to manipulate the audience. Keep the whole briefing under 350 words."
+)
+
+SUMMARY_INSTRUCTIONS = (
+    "You keep running notes on a live propaganda radio show. Merge the earlier notes and the new part of the transcript given after these instructions into at most three plain sentences: what the hosts pushed, what the hacker claimed, and how the hosts responded. Reply with the notes only."
+)
+
+# Request objects that never change, built once instead of on every call.
+STAGE1_INSTRUCTIONS_PART = types.Part.from_text(text=STAGE1_INSTRUCTIONS)
+BRIEFING_INSTRUCTIONS_PART = types.Part.from_text(text=BRIEFING_INSTRUCTIONS)
+SUMMARY_INSTRUCTIONS_PART = types.Part.from_text(text=SUMMARY_INSTRUCTIONS)
+# JSON schemas are passed to the SDK as-is, whereas a response_schema class is re-converted
+# (and each response re-parsed into it) on every request.
+PROPAGANDA_RESULT_SCHEMA = PropagandaGenerationResult.model_json_schema()
+DIALOGUE_TURN_SCHEMA = DialogueTurn.model_json_schema()
+# Output caps sit well above a normal response, so they only cut off runaway generations.
+STAGE1_MAX_OUTPUT_TOKENS = 1024 # Summary, 2-4 speakers and 3-5 key points
+BRIEFING_MAX_OUTPUT_TOKENS = 600 # The prompt asks for under 350 words
+DIALOGUE_MAX_OUTPUT_TOKENS = 700 # Up to 7 short lines
+SUMMARY_MAX_OUTPUT_TOKENS = 120
+STAGE1_CONFIG = types.GenerateContentConfig(
+    response_mime_type="application/json",
+    response_json_schema=PROPAGANDA_RESULT_SCHEMA,
+    max_output_tokens=STAGE1_MAX_OUTPUT_TOKENS,
+    temperature=0.9,
+    thinking_config=types.ThinkingConfig(thinking_budget=0), # Plain structured output; reasoning only adds latency
+)
+BRIEFING_CONFIG = types.GenerateContentConfig(max_output_tokens=BRIEFING_MAX_OUTPUT_TOKENS, temperature=0.8)
+SUMMARY_CONFIG = types.GenerateContentConfig(
+    max_output_tokens=SUMMARY_MAX_OUTPUT_TOKENS,
+    temperature=0.2, # Faithful notes, not creative ones
+    thinking_config=types.ThinkingConfig(thinking_budget=0),
+)
+DIALOGUE_CONFIG = types.GenerateContentConfig( # Copied per mission with its system instruction
+    response_mime_type="application/json",
+    response_json_schema=DIALOGUE_TURN_SCHEMA,
+    max_output_tokens=DIALOGUE_MAX_OUTPUT_TOKENS,
+    temperature=settings.GEMINI_DIALOGUE_TEMPERATURE,
+    top_p=0.95,
+)
+
 class LLMServiceError(Exception):
     """Custom exception for LLM service errors."""
     pass
 
+# Transient Gemini failures (rate limits, overloaded backends) are retried by the SDK itself
+# with jittered exponential backoff; anything else fails straight away.
+RETRYABLE_STATUS_CODES = (429, 500, 502, 503, 504)
+GENAI_RETRY_OPTIONS = types.HttpRetryOptions(
+    attempts=3, # Including the first try
+    initial_delay=0.25,
+    max_delay=2.0,
+    exp_base=2.0,
+    jitter=0.5,
+    http_status_codes=list(RETRYABLE_STATUS_CODES),
+)
+
+# One client for the whole process, so every call reuses its pooled HTTP connections.
+genai_client = genai.Client(
+    api_key=settings.GOOGLE_API_KEY,
+    http_options=types.HttpOptions(retry_options=GENAI_RETRY_OPTIONS),
+)
+
 def _get_genai_client():
-    """Initializes and returns a GenAI client."""
-    return genai.Client(api_key=settings.GOOGLE_API_KEY)
+    """Returns the shared GenAI client."""
+    return genai_client
+
+async def warm_up_genai_client():
+    """
+    Opens the shared client's connections at startup, so the first mission doesn't pay
+    for DNS and the TLS handshake. A model metadata lookup is enough and costs no tokens.
+    Failures are only logged; real requests will simply connect themselves.
+    """
+    try:
+        await genai_client.aio.models.get(model=settings.GEMINI_SETUP_MODEL)
+    except Exception as e:
+        logger.warning("Gemini warm-up failed: %s", e)
+
+def _is_transient(error: Exception) -> bool:
+    if isinstance(error, errors.APIError):
+        return error.code in RETRYABLE_STATUS_CODES
+    return isinstance(error, httpx.TransportError)
+
+class CircuitBreaker:
+    """
+    Stops calling Gemini for a while once it keeps failing even after retries, so players
+    get an immediate error instead of each request waiting out its own backoff. After
+    `reset_timeout` seconds the breaker is half-open: one probe call is let through while
+    every other caller keeps failing fast. A successful probe closes the breaker, a failed
+    one reopens it. A probe that never reports back (e.g. cancelled) expires after
+    `reset_timeout`, and the next caller probes instead.
+    """
+    def __init__(self, fail_max: int = 5, reset_timeout: float = 30.0):
+        self.fail_max = fail_max
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_started = 0.0 # Non-zero while a half-open probe is in flight
+
+    def check(self):
+        """Raises LLMServiceError while the breaker is open, or half-open with a probe already in flight."""
+        if self._failures < self.fail_max:
+            return
+        now = time.monotonic()
+        if now - self._opened_at < self.reset_timeout or now - self._probe_started < self.reset_timeout:
+            raise LLMServiceError("Gemini is temporarily unavailable; please try again shortly.")
+        self._probe_started = now # This caller is the probe
+
+    def record_success(self):
+        self._failures = 0
+        self._probe_started = 0.0
+
+    def record_failure(self, error: Exception):
+        """Counts the error towards opening the breaker if it points at Gemini being down."""
+        self._probe_started = 0.0 # A probe has its answer either way
+        if not _is_transient(error):
+            return
+        self._failures += 1
+        if self._failures >= self.fail_max:
+            self._opened_at = time.monotonic() # (Re)opens, including after a failed probe
+
+genai_breaker = CircuitBreaker()
+
+def _log_usage(call: str, model: str, started: float, usage: types.GenerateContentResponseUsageMetadata | None, first_chunk_at: float | None = None):
+    """Logs one line per Gemini call with its latency and token counts, to see where time goes."""
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    ttfc = f" first_chunk_ms={(first_chunk_at - started) * 1000:.0f}" if first_chunk_at is not None else ""
+    usage = usage or types.GenerateContentResponseUsageMetadata()
+    logger.info(
+        "[LLM] call=%s model=%s total_ms=%.0f%s prompt_tokens=%s cached_tokens=%s output_tokens=%s",
+        call, model, elapsed_ms, ttfc,
+        usage.prompt_token_count, usage.cached_content_token_count or 0, usage.candidates_token_count,
+    )
+
+_SUMMARY_START = re.compile(r'"summary"\s*:\s*')
+_SPEAKERS_START = re.compile(r'"speakers"\s*:\s*')
+
+def _streamed_field(buffer: str, start: re.Pattern, decoder: json.JSONDecoder):
+    """Returns a field's value from a partially streamed JSON object, or None until the value is complete."""
+    match = start.search(buffer)
+    if not match:
+        return None
+    try:
+        return decoder.raw_decode(buffer, match.end())[0]
+    except json.JSONDecodeError:
+        return None
+
+def _streamed_cast(buffer: str, decoder: json.JSONDecoder) -> tuple[str, List[Speaker]] | None:
+    """Returns the summary and speakers once both have fully streamed in, else None."""
+    summary = _streamed_field(buffer, _SUMMARY_START, decoder)
+    speakers = _streamed_field(buffer, _SPEAKERS_START, decoder)
+    if not isinstance(summary, str) or not isinstance(speakers, list):
+        return None
+    try:
+        return summary, [Speaker.model_validate(s) for s in speakers]
+    except ValidationError:
+        return None # Left to the full validation at the end
 
-def generate_initial_propaganda(topic: str | None) -> PropagandaGenerationResult:
+async def generate_initial_propaganda(
+    topic: str | None,
+    on_cast: Callable[[str, List[Speaker]], None] | None = None,
+) -> PropagandaGenerationResult:
     """
     Generates the initial propaganda content (Stage 1).
     If the topic is 'any' or None, it instructs the LLM to invent one.
+    The response is streamed. As soon as its summary and speakers are complete, `on_cast` is
+    called with them, so the briefing (Stage 2) can start while the rest is still generating.
     """
-    topic_instruction = ""
-    topic_field_instruction = ""
     if topic and topic.lower() != "any":
-        topic_instruction = f'**Provided Topic:** "{topic}"\n\n'
-        topic_field_instruction = "Use the provided topic for this field."
+        topic_instruction = STAGE1_PROVIDED_TOPIC.format(topic=topic)
     else:
-        topic_instruction = (
-            "**Topic Generation:** You must invent a topic for the propaganda segment. It should be simple, easy to understand, and clearly a form of propaganda in disguise. Examples could be about a new mandatory 'civic wellness' program, the 'benefits' of constant state surveillance for public safety, or a fabricated 'imminent threat' from a neighboring region that requires national unity.\n\n"
-        )
-        topic_field_instruction = "The topic you just invented."
-
-    prompt = (
-        "You are a producer for a state-sponsored radio talk show. Your task is to create the foundational elements for a propaganda segment. The entire purpose of this radio show is to manipulate public opinion and reinforce the state's narrative. You must create two conflicting sets of information: the **propaganda** that the hosts will spread, and the **hidden truth** that a hacker character can use to debunk it.\n\n"
-        f"{topic_instruction}"
-        "**Your Task:**\n"
-        "Generate the following components as a valid JSON object. Be creative and ensure the propaganda and the truth are compelling and contradictory.\n\n"
-        "1.  **`topic` (The Propaganda Topic):**\n"
-        f"    - {topic_field_instruction}\n\n"
-        "2.  **`summary` (The Propaganda Narrative):**\n"
-        "    - Write a 2-3 sentence summary of the radio show's official, manipulative narrative on the topic. This is the story the hosts will be pushing. It should sound plausible but be fundamentally misleading.\n\n"
-        "3.  **`speakers` (The Propaganda Mouthpieces):**\n"
-        "    - Create a list of 2 to 4 speakers who will appear on the show.\n"
-        "    - Their **name**, **gender**, **role**, and **background** MUST be designed to lend credibility to the propaganda narrative. They should be staunch supporters of the state's view.\n\n"
-        "4.  **`proof_sentences` (The Hidden Truth for the Hacker):**\n"
-        "    - Create a list of 3-5 'Secret Key Points'. These are the **actual facts** of the story that contradict the propaganda narrative. \n"
-        "    - These sentences are the ammunition for the hacker character. They should be specific, verifiable-sounding pieces of information that can be used to expose the hosts' lies.\n\n"
-        "5.  **`initial_listeners`:**\n"
-        "    - Provide a realistic integer for the number of initial listeners (e.g., between 50,000 and 250,000)."
-    )
+        topic_instruction = STAGE1_INVENTED_TOPIC
+
     try:
+        genai_breaker.check()
         client = _get_genai_client()
-        generate_content_config = types.GenerateContentConfig(
-            response_mime_type="application/json",
-            response_schema=PropagandaGenerationResult,
-        )
-        response = client.models.generate_content(
-            model="gemini-2.0-flash",
-            contents=[types.Part.from_text(text=prompt)],
-            config=generate_content_config,
-        )
-        if hasattr(response, 'parsed') and isinstance(response.parsed, PropagandaGenerationResult):
-            return response.parsed
-        raise LLMServiceError("LLM did not return a valid PropagandaGenerationResult object.")
+        started = time.perf_counter()
+        first_chunk_at = None
+        usage = None
+        decoder = json.JSONDecoder()
+        buffer = ""
+        try:
+            response_stream = await client.aio.models.generate_content_stream(
+                model=settings.GEMINI_SETUP_MODEL,
+                contents=[STAGE1_INSTRUCTIONS_PART, types.Part.from_text(text=topic_instruction)],
+                config=STAGE1_CONFIG,
+            )
+            async with aclosing(response_stream):
+                async for chunk in response_stream:
+                    if first_chunk_at is None:
+                        first_chunk_at = time.perf_counter()
+                    usage = chunk.usage_metadata or usage
+                    if not chunk.text:
+                        continue
+                    buffer += chunk.text
+                    if on_cast is not None and (cast := _streamed_cast(buffer, decoder)):
+                        on_cast(*cast)
+                        on_cast = None
+        except Exception as e:
+            genai_breaker.record_failure(e)
+            raise
+        genai_breaker.record_success()
+        _log_usage("stage1", settings.GEMINI_SETUP_MODEL, started, usage, first_chunk_at)
+        try:
+            return PropagandaGenerationResult.model_validate_json(buffer)
+        except ValidationError as e:
+            raise LLMServiceError(f"LLM did not return a valid PropagandaGenerationResult object: {e}")
     except Exception as e:
         raise LLMServiceError(f"An unexpected error occurred during initial propaganda generation: {e}")
 
-def generate_unified_dialogue_prompt(mission_data: PropagandaGenerationResult, topic: str) -> str:
+async def generate_unified_dialogue_prompt(summary: str, speakers: List[Speaker]) -> str:
     """
     Generates the dynamic part of the unified dialogue prompt for Stage 2.
     This includes character descriptions and background info.
     """
-    character_profiles = "\\n".join([f"- {s.name} ({s.gender}, {s.role}): {s.background}" for s in mission_data.speakers])
+    character_profiles = "\n".join(f"- {s.name} ({s.gender}, {s.role}): {s.background}" for s in speakers)
 
-    prompt = (
-        "You are a script director for a dystopian state-sponsored propaganda radio show. Your task is to create the detailed character briefings for the dialogue generation AI. The show's entire purpose is to push a specific, state-approved narrative.\n\n"
-        f"**Show's Propaganda Narrative:** \"{mission_data.summary}\"\n\n"
+    mission_details = (
+        f"**Show's Propaganda Narrative:** \"{summary}\"\n\n"
         "**The Characters (Propagandists):**\n"
-        f"{character_profiles}\n\n"
-        "**Your Task:**\n"
-        "Based on the show's narrative and the character roles, write a detailed 'Show & Character Briefing'. This briefing must define the personality, style, and unwavering pro-state perspective for EACH character. They are propagandists, not debaters. Their goal is to reinforce the narrative, not to explore other viewpoints. This briefing will be used by another AI to generate their dialogue, so be specific and clear about their mission to manipulate the audience."
+        f"{character_profiles}"
     )
     try:
+        genai_breaker.check()
         client = _get_genai_client()
-        response = client.models.generate_content(
-            model="gemini-2.0-flash",
-            contents=[types.Part.from_text(text=prompt)],
-        )
+        started = time.perf_counter()
+        try:
+            response = await client.aio.models.generate_content(
+                model=settings.GEMINI_BRIEFING_MODEL,
+                contents=[BRIEFING_INSTRUCTIONS_PART, types.Part.from_text(text=mission_details)],
+                config=BRIEFING_CONFIG,
+            )
+        except Exception as e:
+            genai_breaker.record_failure(e)
+            raise
+        genai_breaker.record_success()
+        _log_usage("briefing", settings.GEMINI_BRIEFING_MODEL, started, response.usage_metadata)
         if response.text:
             return response.text
         raise LLMServiceError("LLM returned an empty response for the unified dialogue prompt.")
     except Exception as e:
         raise LLMServiceError(f"An unexpected error occurred during unified prompt generation: {e}")
 
-def generate_dialogue(mission_context: str, dialogue_history: str, proof_sentences: List[str]) -> List[DialogueLine]:
-    """
-    Generates the next lines of dialogue for the hosts as a structured object.
-    """
-    prompt = (
-        f"{GENERIC_DIALOGUE_INSTRUCTIONS}\n\n"
-        f"Secret Key Points:\n"
-        f"{'\\n'.join(proof_sentences)}\n\n"
-        f"{GENERIC_AWAKENING_INSTRUCTIONS}\n\n"
-        "**Show & Character Briefing:**\n"
-        f"{mission_context}\n\n"
-        "**Previous Conversation:**\n"
-        f"{dialogue_history}\n\n"
-        "**Your Task:**\n"
-        "Based on all the information above, generate the next turn of the conversation. The output must be a valid JSON object matching the required schema. The conversation should flow naturally."
+async def summarize_dialogue(previous_summary: str, transcript: str) -> str:
+    """
+    Folds a stretch of the show's transcript into the running summary of everything before it,
+    so long shows can send a few sentences instead of their full history with every turn.
+    """
+    notes = (
+        f"**Earlier Notes:**\n{previous_summary or '(none)'}\n\n"
+        f"**New Transcript:**{transcript}"
     )
     try:
+        genai_breaker.check()
         client = _get_genai_client()
-        generate_content_config = types.GenerateContentConfig(
-            response_mime_type="application/json",
-            response_schema=DialogueTurn,
-        )
-        response = client.models.generate_content(
-            model="gemini-2.5-flash-lite-preview-06-17",
-            contents=[types.Part.from_text(text=prompt)],
-            config=generate_content_config,
-        )
-        if hasattr(response, 'parsed') and isinstance(response.parsed, DialogueTurn):
-            return response.parsed.dialogues
-        raise LLMServiceError("LLM did not return a valid DialogueTurn object.")
+        started = time.perf_counter()
+        try:
+            response = await client.aio.models.generate_content(
+                model=settings.GEMINI_SUMMARY_MODEL,
+                contents=[SUMMARY_INSTRUCTIONS_PART, types.Part.from_text(text=notes)],
+                config=SUMMARY_CONFIG,
+            )
+        except Exception as e:
+            genai_breaker.record_failure(e)
+            raise
+        genai_breaker.record_success()
+        _log_usage("summary", settings.GEMINI_SUMMARY_MODEL, started, response.usage_metadata)
+        if response.text:
+            return response.text.strip()
+        raise LLMServiceError("LLM returned an empty dialogue summary.")
+    except Exception as e:
+        raise LLMServiceError(f"An unexpected error occurred during dialogue summarization: {e}")
+
+_DIALOGUES_ARRAY_START = re.compile(r'"dialogues"\s*:\s*\[')
+
+async def _parse_streamed_dialogues(text_chunks: AsyncIterable[str]) -> AsyncIterator[DialogueLine]:
+    """
+    Incrementally parses a streamed DialogueTurn JSON document, yielding each entry
+    of its `dialogues` array as soon as that entry's object is complete.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = -1 # Where the next array entry may start; -1 until the array has opened
+    async for text in text_chunks:
+        buffer += text
+        if pos < 0:
+            match = _DIALOGUES_ARRAY_START.search(buffer)
+            if not match:
+                continue
+            pos = match.end()
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos == len(buffer):
+                break
+            if buffer[pos] != "{":
+                return # End of the dialogues array; nothing after it is needed
+            try:
+                entry, pos_after = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                break # Entry not fully received yet
+            yield DialogueLine.model_validate(entry)
+            pos = pos_after
+
+@lru_cache(maxsize=256)
+def _dialogue_config(mission_context: str, proof_sentences: tuple[str, ...]) -> types.GenerateContentConfig:
+    """
+    Builds a mission's dialogue config once; every later turn of the mission reuses it.
+    Everything that stays the same for a mission goes in the system instruction, ahead of the
+    conversation, so successive turns share a byte-identical prefix that Gemini can cache.
+    """
+    system_instruction = DIALOGUE_SYSTEM_TEMPLATE.format(
+        proofs="\n".join(f"- {p}" for p in proof_sentences),
+        mission_context=mission_context,
+    )
+    return DIALOGUE_CONFIG.model_copy(update={"system_instruction": system_instruction})
+
+DIALOGUE_HEDGE_DELAY = 3.0 # Seconds without a first chunk before a duplicate request is raced against the first
+
+_StreamStart = Tuple[AsyncIterator[types.GenerateContentResponse], types.GenerateContentResponse]
+_closing_streams: Set[asyncio.Task] = set() # Keeps cleanup of hedging losers alive until it finishes
+
+async def _open_stream(**request) -> _StreamStart:
+    """Starts a streamed request and waits for its first chunk."""
+    stream = await _get_genai_client().aio.models.generate_content_stream(**request)
+    try:
+        return stream, await anext(stream)
+    except BaseException:
+        await stream.aclose()
+        raise
+
+def _discard_stream(task: asyncio.Task):
+    if not task.cancelled() and task.exception() is None:
+        closing = asyncio.ensure_future(task.result()[0].aclose())
+        _closing_streams.add(closing)
+        closing.add_done_callback(_closing_streams.discard)
+
+async def _open_stream_hedged(**request) -> _StreamStart:
+    """
+    Like _open_stream, but if no chunk has arrived after DIALOGUE_HEDGE_DELAY, an identical
+    request is raced against the first and whichever streams first is used. Only requests
+    stuck in the slow tail pay for a duplicate.
+    """
+    tasks = [asyncio.create_task(_open_stream(**request))]
+    winner = None
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=DIALOGUE_HEDGE_DELAY)
+        if not done:
+            tasks.append(asyncio.create_task(_open_stream(**request)))
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    winner = task
+                    return task.result()
+        raise tasks[0].exception() # type: ignore # Every attempt failed
+    finally:
+        for task in tasks:
+            if task is not winner:
+                task.cancel()
+                task.add_done_callback(_discard_stream) # In case it finished anyway
+
+async def generate_dialogue_stream(mission_context: str, dialogue_history: str, proof_sentences: List[str]) -> AsyncIterator[DialogueLine]:
+    """
+    Generates the next lines of dialogue for the hosts, yielding each line as soon as
+    the model has streamed it, so TTS for the first line can start before the rest arrive.
+    """
+    prompt = DIALOGUE_PROMPT_TEMPLATE.format(dialogue_history=dialogue_history)
+    try:
+        genai_breaker.check()
+        generate_content_config = _dialogue_config(mission_context, tuple(proof_sentences))
+        started = time.perf_counter()
+        first_chunk_at = None
+        usage = None
+
+        async def stream_texts(first_chunk: types.GenerateContentResponse, response_stream: AsyncIterator[types.GenerateContentResponse]) -> AsyncIterator[str]:
+            nonlocal usage
+            if first_chunk.text:
+                yield first_chunk.text
+            async for chunk in response_stream:
+                usage = chunk.usage_metadata or usage # Running totals; the latest chunk has the most
+                if chunk.text:
+                    yield chunk.text
+
+        try:
+            response_stream, first_chunk = await _open_stream_hedged(
+                model=settings.GEMINI_DIALOGUE_MODEL,
+                contents=[types.Part.from_text(text=prompt)],
+                config=generate_content_config,
+            )
+            first_chunk_at = time.perf_counter()
+            usage = first_chunk.usage_metadata
+            # The parser stops at the end of the dialogues array; closing the stream then
+            # releases the connection instead of leaving it to the garbage collector.
+            async with aclosing(response_stream), aclosing(_parse_streamed_dialogues(stream_texts(first_chunk, response_stream))) as dialogues:
+                async for dialogue in dialogues:
+                    yield dialogue
+        except Exception as e:
+            genai_breaker.record_failure(e)
+            raise
+        genai_breaker.record_success()
+        _log_usage("dialogue", settings.GEMINI_DIALOGUE_MODEL, started, usage, first_chunk_at)
     except Exception as e:
         raise LLMServiceError(f"An unexpected error occurred during dialogue generation: {e}")
@@ -8,12 +8,28 @@ import aiohttp
 import queue
 import threading
 import sounddevice as sd
-import numpy as np
+
+try:
+    import orjson # Faster JSON for the websocket control frames
+    json_loads = orjson.loads
+    def json_dumps(obj) -> str:
+        return orjson.dumps(obj).decode() # Text frame, as the server expects
+except ImportError:
+    json_loads = json.loads
+    json_dumps = json.dumps
+
+try:
+    import uvloop # Faster event loop for the websocket and polling I/O; not available on Windows
+except ImportError:
+    uvloop = None
 
 # --- Configuration ---
 BASE_URL = "http://localhost:8000/api/v1"
 TTS_SAMPLE_RATE = 24000  # Deepgram's Aura TTS output sample rate
 CHANNELS = 1
+POLL_INITIAL_INTERVAL = 0.5  # Seconds between status polls, doubling up to POLL_MAX_INTERVAL
+POLL_MAX_INTERVAL = 4.0
+STATUS_LONG_POLL_WAIT = 25  # Seconds the server may hold a status request open until stage 2
 
 # --- Global State ---
 mission_data_storage = {}
@@ -23,44 +39,37 @@ def pretty_print_json(data):
     print(json.dumps(data, indent=4))
 
 # --- Audio Playback Thread ---
-def audio_player_thread(audio_q: queue.Queue):
+def audio_player_thread(audio_q: queue.SimpleQueue):
     """
-    A dedicated thread for playing audio from a queue. It buffers incoming byte chunks
-    to ensure that only complete audio samples (multiples of 2 bytes for int16) are played.
+    A dedicated thread for playing audio from a queue. Chunks are written to the device as raw
+    bytes; only complete int16 samples are played, and a split sample is carried to the next chunk.
     """
-    stream = sd.OutputStream(samplerate=TTS_SAMPLE_RATE, channels=CHANNELS, dtype='int16')
+    stream = sd.RawOutputStream(samplerate=TTS_SAMPLE_RATE, channels=CHANNELS, dtype='int16')
     stream.start()
-    audio_buffer = bytearray()
+    carry = b"" # The first byte of a sample split across chunks, if any
     
     while True:
         chunk = audio_q.get()
         if chunk is None:
             break
             
-        audio_buffer.extend(chunk)
+        if carry:
+            chunk = carry + chunk # Rare: frames are almost always whole samples
         
-        # Process and play audio in chunks that are a multiple of the sample size (2 bytes for int16)
-        playable_size = (len(audio_buffer) // 2) * 2
+        # Play the largest prefix that is a multiple of the sample size (2 bytes for int16)
+        playable_size = len(chunk) & ~1
+        carry = chunk[playable_size:]
         
         if playable_size > 0:
-            data_to_play = audio_buffer[:playable_size]
             try:
-                audio_chunk_np = np.frombuffer(data_to_play, dtype=np.int16)
-                stream.write(audio_chunk_np)
+                stream.write(memoryview(chunk)[:playable_size])
             except Exception as e:
                 print(f"[PLAYER-ERROR] Could not play audio chunk: {e}")
-            
-            # Keep the remainder in the buffer
-            audio_buffer = audio_buffer[playable_size:]
 
-    # Play any remaining audio in the buffer after the loop finishes
-    if len(audio_buffer) > 0:
-        # Pad with a zero byte if the buffer has an odd number of bytes
-        if len(audio_buffer) % 2 != 0:
-            audio_buffer.append(0)
+    # Play a dangling half sample after the loop finishes, padded with a zero byte
+    if carry:
         try:
-            final_chunk = np.frombuffer(audio_buffer, dtype=np.int16)
-            stream.write(final_chunk)
+            stream.write(carry + b"\x00")
         except Exception as e:
             print(f"[PLAYER-ERROR] Could not play final audio buffer: {e}")
             
@@ -90,11 +99,19 @@ async def create_mission(session: aiohttp.ClientSession):
         print(f"An error occurred: {e}")
 
 async def poll_mission_status(session: aiohttp.ClientSession, mission_id: str):
-    """Polls until the mission is ready (stage2)."""
+    """
+    Polls until the mission is ready (stage2). Each request long-polls: the server answers as
+    soon as stage 2 finishes. Backoff only applies when it answers without waiting.
+    """
     print(f"\nPolling status for mission: {mission_id}")
+    loop = asyncio.get_running_loop()
+    interval = POLL_INITIAL_INTERVAL
     while True:
         try:
-            async with session.get(f"{BASE_URL}/mission_status/{mission_id}") as response:
+            started = loop.time()
+            async with session.get(
+                f"{BASE_URL}/mission_status_light/{mission_id}", params={"wait": STATUS_LONG_POLL_WAIT}
+            ) as response:
                 response.raise_for_status()
                 status_data = await response.json()
                 current_status = status_data.get("status")
@@ -102,19 +119,22 @@ async def poll_mission_status(session: aiohttp.ClientSession, mission_id: str):
                 if current_status == "stage2":
                     print("Stage 2 reached! Connecting to WebSocket...")
                     return True
-                await asyncio.sleep(2)
+                if loop.time() - started < STATUS_LONG_POLL_WAIT:
+                    await asyncio.sleep(interval)
+                    interval = min(interval * 2, POLL_MAX_INTERVAL)
         except aiohttp.ClientError as e:
             print(f"An error occurred while polling: {e}")
             return False
 
 async def handle_websocket_communication(uri: str):
     """Manages the entire WebSocket lifecycle including audio I/O and text input."""
-    audio_output_q = queue.Queue()
+    audio_output_q = queue.SimpleQueue() # C-implemented; no task tracking or size limit to lock for
     player = threading.Thread(target=audio_player_thread, args=(audio_output_q,))
     player.start()
     
     try:
-        async with websockets.connect(uri) as websocket:
+        # PCM audio doesn't compress; skipping permessage-deflate saves CPU on every frame
+        async with websockets.connect(uri, compression=None) as websocket:
             print("\n[SUCCESS] WebSocket connection established.")
             
             # Task to send user text input to the server
@@ -123,23 +143,23 @@ async def handle_websocket_communication(uri: str):
                     user_input = await asyncio.to_thread(input, "You: ")
                     if user_input.lower() == "exit":
                         break
-                    await websocket.send(json.dumps({"user_dialogue": user_input}))
+                    await websocket.send(json_dumps({"user_dialogue": user_input}))
 
             # Task to receive server messages
             async def server_receiver():
-                while True:
-                    try:
-                        message = await websocket.recv()
+                # Iteration ends cleanly on a normal close; only an abnormal close raises.
+                try:
+                    async for message in websocket:
                         if isinstance(message, bytes):
                             audio_output_q.put(message)
                         elif isinstance(message, str):
-                            data = json.loads(message)
+                            data = json_loads(message)
                             if "awakened_listeners" in data:
                                 print(f"[LISTENERS] Awakened: {data['awakened_listeners']}", end='\r')
                             # Removed dialogue_end and ready_for_next handling
-                    except websockets.exceptions.ConnectionClosed:
-                        print("\n[INFO] WebSocket connection closed by the server.")
-                        break
+                except websockets.exceptions.ConnectionClosed:
+                    pass
+                print("\n[INFO] WebSocket connection closed by the server.")
             
             sender_task = asyncio.create_task(text_sender())
             receiver_task = asyncio.create_task(server_receiver())
@@ -155,10 +175,12 @@ async def handle_websocket_communication(uri: str):
 
 async def main():
     """Main function to run the test script."""
-    print("NOTE: This script requires 'sounddevice', 'numpy', and 'aiohttp'.")
-    print("Install them with: pip install sounddevice numpy aiohttp")
+    print("NOTE: This script requires 'sounddevice' and 'aiohttp'.")
+    print("Install them with: pip install sounddevice aiohttp")
     
-    async with aiohttp.ClientSession() as session:
+    # One keep-alive connection pool for every request, with DNS lookups cached between polls
+    connector = aiohttp.TCPConnector(limit=32, ttl_dns_cache=300, keepalive_timeout=60)
+    async with aiohttp.ClientSession(connector=connector) as session:
         while True:
             print("\n--- Test Menu ---")
             print("1. Create a new mission")
@@ -195,7 +217,7 @@ async def main():
 
 if __name__ == "__main__":
     try:
-        asyncio.run(main())
+        (uvloop.run if uvloop else asyncio.run)(main())
     except KeyboardInterrupt:
         print("\nExiting script.")
         sys.exit(0)
\ No newline at end of file
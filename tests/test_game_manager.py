@@ -0,0 +1,151 @@
+"""
+Offline tests for the game session plumbing. No network: TTS and websockets are faked.
+
+Run with: python -m unittest tests.test_game_manager
+"""
+import asyncio
+import os
+import unittest
+from unittest import mock
+
+# Settings refuse to load without API keys; these tests never call the real services.
+os.environ.setdefault("DEEPGRAM_API_KEY", "test")
+os.environ.setdefault("GOOGLE_API_KEY", "test")
+os.environ.setdefault("RADIO_MIRCHI_NO_DOTENV", "1")
+
+from app.api.v1.endpoints import game
+from app.schemas.propaganda import DialogueLine
+from app.services import game_manager
+from app.services.game_manager import AUDIO_FRAME_MAX_BYTES, OUTBOX_MAX_SIZE, ConnectionManager, GameSession
+
+class StalledWebSocket:
+    """A client that has stopped reading: every send blocks."""
+    async def accept(self):
+        pass
+
+    async def send_bytes(self, data: bytes):
+        await asyncio.Event().wait()
+
+    async def send_text(self, data: str):
+        await asyncio.Event().wait()
+
+class RecordingWebSocket:
+    def __init__(self):
+        self.frames = []
+
+    async def accept(self):
+        pass
+
+    async def send_bytes(self, data: bytes):
+        self.frames.append(data)
+
+    async def send_text(self, data: str):
+        self.frames.append(data)
+
+class FakeSpeakStream:
+    """Yields `frames` full-size audio frames for any line."""
+    def __init__(self, frames: int):
+        self.frames = frames
+
+    async def speak(self, text: str):
+        for _ in range(self.frames):
+            yield bytes(AUDIO_FRAME_MAX_BYTES)
+            await asyncio.sleep(0)
+
+class ReconnectTest(unittest.IsolatedAsyncioTestCase):
+    async def test_reconnect_mid_line_sends_rest_of_line_to_new_client(self):
+        manager = ConnectionManager()
+        await manager.connect(StalledWebSocket(), "mission")
+        session = GameSession("mission", manager)
+        frames = OUTBOX_MAX_SIZE * 3
+        session._speak_stream_for = lambda speaker_name: FakeSpeakStream(frames)
+
+        line = DialogueLine(speaker_name="Host", line="Good evening.")
+        session.dialogue_queue.put_nowait(line)
+        await session.dialogue_queue.get()
+        tts_task = asyncio.create_task(session._stream_tts_for_line(line))
+
+        # Wait until the stalled client's outbox is full and the line is blocked on it.
+        while manager.get_outbox("mission").qsize() < OUTBOX_MAX_SIZE:
+            await asyncio.sleep(0.01)
+        self.assertFalse(tts_task.done())
+
+        new_client = RecordingWebSocket()
+        await manager.connect(new_client, "mission")
+        await asyncio.wait_for(tts_task, timeout=5)
+        while not manager.get_outbox("mission").empty():
+            await asyncio.sleep(0.01)
+
+        # Lost with the old client: the frame stuck in its send, its queued frames and the
+        # one put that was pending at takeover. Everything after reaches the new client.
+        self.assertGreaterEqual(len(new_client.frames), frames - OUTBOX_MAX_SIZE - 2)
+        self.assertIn("Host: Good evening.", session.dialogue_history)
+
+        manager.disconnect("mission")
+        await session.stop()
+
+class DialogueCacheTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.calls = 0
+
+        async def generate(mission_context, dialogue_history, proof_sentences):
+            self.calls += 1
+            yield DialogueLine(speaker_name="Host", line=f"Take {self.calls}.")
+
+        patcher = mock.patch.object(game_manager, "generate_dialogue_stream", generate)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(game_manager._dialogue_cache.clear)
+
+    async def _opening(self) -> list:
+        session = GameSession("mission", ConnectionManager())
+        session.mission_context = "context"
+        lines = [line async for line in session._dialogue_lines()]
+        await session.stop()
+        return lines
+
+    async def test_batches_are_not_replayed_by_default(self):
+        self.assertEqual((await self._opening())[0].line, "Take 1.")
+        self.assertEqual((await self._opening())[0].line, "Take 2.")
+
+    async def test_enabled_cache_replays_identical_prompts(self):
+        with mock.patch.object(game_manager, "DIALOGUE_CACHE_ENABLED", True):
+            self.assertEqual((await self._opening())[0].line, "Take 1.")
+            self.assertEqual((await self._opening())[0].line, "Take 1.")
+        self.assertEqual(self.calls, 1)
+
+class HistoryFoldTest(unittest.IsolatedAsyncioTestCase):
+    async def test_fold_keeps_newer_lines_evicted_into_place(self):
+        summarized = asyncio.Event()
+
+        async def summarize(previous_summary, transcript):
+            await summarized.wait()
+            return "summary"
+
+        session = GameSession("mission", ConnectionManager())
+        with mock.patch.object(game_manager, "summarize_dialogue", summarize):
+            lines = [f"\nHost: line {i}" for i in range(game_manager.DIALOGUE_HISTORY_MAX_LINES)]
+            for line in lines:
+                session._append_history(line)
+            # While the summary is pending, enough lines arrive to push some folded ones out.
+            for i in range(3):
+                session._append_history(f"\nHost: late {i}")
+            summarized.set()
+            await session._summary_task
+
+        remaining = list(session._history_parts)
+        self.assertNotIn(lines[game_manager.DIALOGUE_HISTORY_FOLD_LINES - 1], remaining)
+        self.assertEqual(remaining[0], lines[game_manager.DIALOGUE_HISTORY_FOLD_LINES])
+        self.assertEqual(remaining[-1], "\nHost: late 2")
+        await session.stop()
+
+class SessionLimitTest(unittest.IsolatedAsyncioTestCase):
+    async def test_full_pool_closes_with_try_again_later(self):
+        websocket = mock.AsyncMock()
+        with mock.patch.object(game.session_pool, "acquire", return_value=None):
+            await game.websocket_endpoint(websocket, "mission")
+        websocket.accept.assert_awaited_once()
+        websocket.close.assert_awaited_once_with(code=1013)
+
+if __name__ == "__main__":
+    unittest.main()